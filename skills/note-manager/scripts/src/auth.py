@@ -4,31 +4,225 @@ Google Keep Authentication
 Handles login and token management for Google Keep API
 """
 
-import gkeepapi
 import os
 import json
+import time
+import uuid
 from pathlib import Path
 
+# OAuth session tokens last about an hour; stop reusing a cached one a bit earlier
+SESSION_TOKEN_LIFETIME = 3600 - 300
+
+
+class CredentialsNotFoundError(FileNotFoundError):
+    """Raised when the credentials file has not been created yet (see setup_credentials)."""
+
 
 def get_credentials_path():
     """Get path to credentials file."""
     return os.path.expanduser("~/.claude/credentials/gkeep_credentials.json")
 
 
+def get_state_path():
+    """Get path to the local Keep state cache."""
+    return os.path.expanduser("~/.claude/credentials/gkeep_state.json")
+
+
+def get_session_path():
+    """Get path to the cached OAuth session token."""
+    return os.path.expanduser("~/.claude/credentials/gkeep_session.json")
+
+
+def load_session(username):
+    """
+    Load the cached OAuth session token if it is still valid.
+
+    Args:
+        username: Account the token must belong to
+
+    Returns:
+        dict: Session with 'auth_token', 'device_id' and 'expires_at', or None
+    """
+    session_path = get_session_path()
+    if not os.path.exists(session_path):
+        return None
+
+    try:
+        with open(session_path, "r") as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(session, dict) or session.get("username") != username:
+        return None
+    if not session.get("auth_token") or not session.get("device_id"):
+        return None
+    if time.time() >= session.get("expires_at", 0):
+        return None
+
+    return session
+
+
+def save_session(username, auth_token, device_id):
+    """
+    Cache an OAuth session token next to the credentials file (0600).
+
+    Args:
+        username: Account the token belongs to
+        auth_token: OAuth token derived from the master token
+        device_id: Device id the token was issued for
+    """
+    session_path = get_session_path()
+    Path(session_path).parent.mkdir(parents=True, exist_ok=True)
+
+    session = {
+        "username": username,
+        "auth_token": auth_token,
+        "device_id": device_id,
+        "expires_at": time.time() + SESSION_TOKEN_LIFETIME,
+    }
+
+    tmp_path = f"{session_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(session, f)
+    os.replace(tmp_path, session_path)
+
+
+def get_api_auth(username, token):
+    """
+    Build the gkeepapi authentication object, reusing the cached session token.
+
+    Exchanging the master token for an OAuth token is a network round-trip,
+    so it only happens when the cached token is missing or expired. Any later
+    refresh (e.g. gkeepapi retrying after a 401) updates the cache too.
+
+    Args:
+        username: Google account email
+        token: Master token
+
+    Returns:
+        gkeepapi.APIAuth: Ready-to-use authentication object
+    """
+    import gkeepapi
+
+    session = load_session(username)
+    device_id = session["device_id"] if session else f"{uuid.getnode():x}"
+
+    auth = gkeepapi.APIAuth(gkeepapi.Keep.OAUTH_SCOPES)
+    auth.setEmail(username)
+    auth.setMasterToken(token)
+    auth.setDeviceId(device_id)
+
+    # Persist every new token, including the transparent refresh done by gkeepapi on 401
+    refresh = auth.refresh
+
+    def refresh_and_cache():
+        auth_token = refresh()
+        save_session(username, auth_token, device_id)
+        return auth_token
+
+    auth.refresh = refresh_and_cache
+
+    if session:
+        # APIAuth has no public setter for the OAuth token
+        auth._auth_token = session["auth_token"]
+    else:
+        auth.refresh()
+
+    return auth
+
+
+def load_keep_state(username):
+    """
+    Load the cached Keep state (serialized notes + sync cursor).
+
+    Args:
+        username: Account the state must belong to
+
+    Returns:
+        dict: Saved state, or None if missing, unreadable or from another account
+    """
+    state_path = get_state_path()
+    if not os.path.exists(state_path):
+        return None
+
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(state, dict) or not {"keep_version", "labels", "nodes"} <= state.keys():
+        return None
+    if state.get("username") != username:
+        return None
+
+    return state
+
+
+def save_keep_state(keep):
+    """
+    Save the Keep state to the local cache so the next run only syncs deltas.
+
+    Args:
+        keep: Synced Keep client
+    """
+    state_path = get_state_path()
+    Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+
+    state = keep.dump()
+    # Keep has no public accessor for the account it is logged in with
+    state["username"] = keep._keep_api.getAuth().getEmail()
+
+    # Write to a temp file first so an interrupted run never leaves a truncated cache
+    tmp_path = f"{state_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def sync_keep(keep):
+    """
+    Sync with the server and persist the local state cache.
+
+    Falls back to a full resync if the server rejects the cached sync cursor.
+
+    Args:
+        keep: Authenticated Keep client
+    """
+    from gkeepapi.exception import ResyncRequiredException
+
+    try:
+        keep.sync()
+    except ResyncRequiredException:
+        keep.sync(resync=True)
+
+    save_keep_state(keep)
+
+
 def get_keep_client():
     """
     Get authenticated Google Keep client.
 
+    The cached state is restored before resuming, so the first sync only
+    pulls changes made since the previous run, and the cached OAuth session
+    token is reused while valid.
+
     Returns:
-        gkeepapi.Keep: Authenticated Keep client
+        gkeepapi.Keep: Authenticated Keep client (not yet synced)
     """
+    # Imported lazily: CLIs that forward to the daemon never need gkeepapi
+    import gkeepapi
+
     keep = gkeepapi.Keep()
 
     credentials_path = get_credentials_path()
 
     # Check if credentials exist
     if not os.path.exists(credentials_path):
-        raise FileNotFoundError(
+        raise CredentialsNotFoundError(
             f"Credentials not found at {credentials_path}\n"
             "Please run: cd ~/.claude/skills/note-manager/scripts && ./run.sh auth"
         )
@@ -43,8 +237,18 @@ def get_keep_client():
     if not username or not token:
         raise ValueError("Invalid credentials file. Missing username or token.")
 
-    # Resume session with master token (authenticate is the new method name but resume still works)
-    keep.resume(username, token)
+    # Restore cached notes and sync cursor (only if they belong to this account)
+    state = load_keep_state(username)
+    if state is not None:
+        try:
+            keep.restore(state)
+        except (KeyError, TypeError, ValueError):
+            # Cache written by an incompatible gkeepapi version: start from scratch
+            keep = gkeepapi.Keep()
+
+    # Authenticate with the cached session token (or the master token if it expired)
+    # Syncing is left to the caller (see sync_keep) to avoid a redundant round-trip
+    keep.load(get_api_auth(username, token), sync=False)
 
     return keep
 
@@ -55,6 +259,7 @@ def setup_credentials():
     This should be run once to obtain and save the authentication token.
     """
     import getpass
+    import gkeepapi
 
     keep = gkeepapi.Keep()
 
@@ -6,20 +6,228 @@ Create, update, archive, pin, delete, and duplicate notes
 
 import argparse
 import json
-from auth import get_keep_client
-import gkeepapi
-
-
-def get_note_by_id(keep, note_id):
-    """Get a note by its ID."""
-    keep.sync()
+import os
+import sys
+from auth import CredentialsNotFoundError, get_keep_client, sync_keep
+from note_archive import get_archive_index_path, read_archive, write_archive
+from note_daemon import forward_to_daemon
+from note_index import parse_query
+from note_serializer import format_note_full
+
+
+def get_note_by_id(keep, note_id, sync=True):
+    """Get a note by its ID (syncing first unless sync is False)."""
+    if sync:
+        sync_keep(keep)
     note = keep.get(note_id)
     if not note:
         raise ValueError(f"Note with ID {note_id} not found")
     return note
 
 
-def create_text_note(keep, title, text, pinned=False, color=None):
+def set_note_color(note, color):
+    """Set a note color from its name (e.g. "red"), warning on unknown names."""
+    from gkeepapi.node import ColorValue
+
+    # Accept enum names ("Red", "DarkBlue") as well as API values ("RED", "CERULEAN"), in any case
+    for value in ColorValue:
+        if color.lower() in (value.name.lower(), value.value.lower()):
+            note.color = value
+            return
+
+    print(f"Warning: Unknown color '{color}', using default")
+
+
+def parse_list_item(item):
+    """
+    Normalize an item given on the command line or in a batch/archive.
+
+    Args:
+        item: Item text, or dict with 'text', optional 'checked' and optional 'sort'
+
+    Returns:
+        Tuple (text, checked, sort) where sort is None unless an int was given
+    """
+    if isinstance(item, dict):
+        sort = item.get("sort")
+        return item.get("text", ""), item.get("checked", False), sort if isinstance(sort, int) else None
+    return str(item), False, None
+
+
+def add_list_item(note, item):
+    """
+    Append an item at the bottom of a list note.
+
+    Args:
+        note: List note
+        item: Item text, or dict with 'text', optional 'checked' and optional 'sort'
+              (an explicit sort value keeps the item's original position)
+
+    Returns:
+        Created list item
+    """
+    from gkeepapi.node import NewListItemPlacementValue
+
+    text, checked, sort = parse_list_item(item)
+
+    # Without a placement gkeepapi picks a random sort value, scrambling the order
+    if sort is None:
+        sort = NewListItemPlacementValue.Bottom
+
+    return note.add(text, checked, sort)
+
+
+def _longest_increasing_run(positions):
+    """
+    Return the indexes of a longest strictly increasing subsequence.
+
+    Args:
+        positions: List of ints (None entries are skipped)
+
+    Returns:
+        Set of indexes into positions
+    """
+    # tails[k] = index of the smallest tail of an increasing subsequence of length k + 1
+    tails = []
+    previous = [None] * len(positions)
+
+    for i, position in enumerate(positions):
+        if position is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if positions[tails[middle]] < position:
+                low = middle + 1
+            else:
+                high = middle
+        previous[i] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(i)
+        else:
+            tails[low] = i
+
+    result = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+def _spread_sorts(upper, lower, count, delta):
+    """
+    Pick `count` descending sort values strictly between upper and lower.
+
+    Args:
+        upper: Sort value of the item above (None at the top)
+        lower: Sort value of the item below (None at the bottom)
+        count: Number of values needed
+        delta: Default spacing between items
+
+    Returns:
+        List of ints, or None if there is no room between the bounds
+    """
+    if upper is None and lower is None:
+        upper = (count + 1) * delta
+    if upper is None:
+        upper = lower + (count + 1) * delta
+    if lower is None:
+        lower = upper - (count + 1) * delta
+
+    step = (upper - lower) // (count + 1)
+    if step < 1:
+        return None
+    return [upper - step * (i + 1) for i in range(count)]
+
+
+def diff_list_items(note, items):
+    """
+    Update a list note's items with a minimal set of edits.
+
+    Items are matched to existing ones by text (in order, so duplicates pair
+    up by position). Matched items only get their checkbox toggled if needed;
+    the longest run already in the right order keeps its sort values and the
+    others are repositioned between their neighbours. Only truly new items
+    are added and only items absent from the new list are deleted.
+
+    Args:
+        note: List note
+        items: New items in display order (texts or dicts, see parse_list_item)
+
+    Returns:
+        dict: Counts of added, deleted, checked (toggled) and moved items
+    """
+    existing = list(note.items)
+    wanted = [parse_list_item(item) for item in items]
+
+    # Match new items to existing ones by text, first come first served
+    by_text = {}
+    for position, item in enumerate(existing):
+        by_text.setdefault(item.text, []).append(position)
+
+    matches = []
+    for text, _, _ in wanted:
+        candidates = by_text.get(text)
+        matches.append(candidates.pop(0) if candidates else None)
+
+    stats = {"added": 0, "deleted": 0, "checked": 0, "moved": 0}
+
+    # Delete items that no longer exist
+    matched_positions = {position for position in matches if position is not None}
+    for position, item in enumerate(existing):
+        if position not in matched_positions:
+            item.delete()
+            stats["deleted"] += 1
+
+    # Toggle checkboxes only where they changed
+    for (_, checked, _), position in zip(wanted, matches):
+        if position is not None and existing[position].checked != checked:
+            existing[position].checked = checked
+            stats["checked"] += 1
+
+    # Items that are already in relative order keep their sort values
+    anchors = _longest_increasing_run(matches)
+    sorts = [int(existing[matches[i]].sort) if i in anchors else None for i in range(len(wanted))]
+
+    # Fill the gaps between anchors with evenly spaced sort values
+    delta = note.SORT_DELTA
+    i = 0
+    while i < len(wanted):
+        if sorts[i] is not None:
+            i += 1
+            continue
+
+        end = i
+        while end < len(wanted) and sorts[end] is None:
+            end += 1
+
+        upper = sorts[i - 1] if i > 0 else None
+        lower = sorts[end] if end < len(wanted) else None
+        spread = _spread_sorts(upper, lower, end - i, delta)
+
+        if spread is None:
+            # No room between neighbours: renumber the whole list
+            top = max(int(item.sort) for item in existing) if existing else 0
+            sorts = [top - delta * k for k in range(len(wanted))]
+            break
+
+        sorts[i:end] = spread
+        i = end
+
+    # Apply positions: add new items, move matched ones whose sort changed
+    for (text, checked, _), position, sort in zip(wanted, matches, sorts):
+        if position is None:
+            note.add(text, checked, sort)
+            stats["added"] += 1
+        elif int(existing[position].sort) != sort:
+            existing[position].sort = sort
+            stats["moved"] += 1
+
+    return stats
+
+
+def create_text_note(keep, title, text, pinned=False, color=None, sync=True):
     """
     Create a text note.
 
@@ -29,6 +237,7 @@ def create_text_note(keep, title, text, pinned=False, color=None):
         text: Note content
         pinned: Whether to pin the note
         color: Note color (optional)
+        sync: Sync with the server after creating (False to defer to a later sync)
 
     Returns:
         Created note
@@ -39,25 +248,24 @@ def create_text_note(keep, title, text, pinned=False, color=None):
         note.pinned = True
 
     if color:
-        try:
-            note.color = getattr(gkeepapi.node.ColorValue, color.upper())
-        except AttributeError:
-            print(f"Warning: Unknown color '{color}', using default")
+        set_note_color(note, color)
 
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def create_list_note(keep, title, items, pinned=False, color=None):
+def create_list_note(keep, title, items, pinned=False, color=None, sync=True):
     """
     Create a list note.
 
     Args:
         keep: Authenticated Keep client
         title: Note title
-        items: List of item texts or dicts with 'text' and optional 'checked'
+        items: List of item texts or dicts with 'text' and optional 'checked' (see add_list_item)
         pinned: Whether to pin the note
         color: Note color (optional)
+        sync: Sync with the server after creating (False to defer to a later sync)
 
     Returns:
         Created note
@@ -66,29 +274,20 @@ def create_list_note(keep, title, items, pinned=False, color=None):
 
     # Add items
     for item in items:
-        if isinstance(item, dict):
-            text = item.get("text", "")
-            checked = item.get("checked", False)
-        else:
-            text = str(item)
-            checked = False
-
-        list_item = note.add(text, checked)
+        add_list_item(note, item)
 
     if pinned:
         note.pinned = True
 
     if color:
-        try:
-            note.color = getattr(gkeepapi.node.ColorValue, color.upper())
-        except AttributeError:
-            print(f"Warning: Unknown color '{color}', using default")
+        set_note_color(note, color)
 
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def update_note(keep, note_id, title=None, text=None, items=None):
+def update_note(keep, note_id, title=None, text=None, items=None, sync=True):
     """
     Update an existing note.
 
@@ -97,67 +296,60 @@ def update_note(keep, note_id, title=None, text=None, items=None):
         note_id: ID of the note to update
         title: New title (optional)
         text: New text content (optional, for text notes)
-        items: New list items (optional, for list notes)
+        items: New list items in display order (optional, for list notes; see diff_list_items)
+        sync: Sync with the server before and after updating (False to defer to a later sync)
 
     Returns:
         Updated note
     """
-    note = get_note_by_id(keep, note_id)
+    note = get_note_by_id(keep, note_id, sync=sync)
 
     if title is not None:
         note.title = title
 
     # Check if it's a list note
-    if hasattr(note, "items") and note.items:
+    if hasattr(note, "items"):
         if items is not None:
-            # Clear existing items
-            for item in list(note.items):
-                item.delete()
-
-            # Add new items
-            for item_data in items:
-                if isinstance(item_data, dict):
-                    text = item_data.get("text", "")
-                    checked = item_data.get("checked", False)
-                else:
-                    text = str(item_data)
-                    checked = False
-
-                note.add(text, checked)
+            # Only send the delta (toggles, moves, additions, deletions) to the server
+            diff_list_items(note, items)
     else:
         # Text note
         if text is not None:
             note.text = text
 
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def archive_note(keep, note_id, archived=True):
+def archive_note(keep, note_id, archived=True, sync=True):
     """Archive or unarchive a note."""
-    note = get_note_by_id(keep, note_id)
+    note = get_note_by_id(keep, note_id, sync=sync)
     note.archived = archived
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def pin_note(keep, note_id, pinned=True):
+def pin_note(keep, note_id, pinned=True, sync=True):
     """Pin or unpin a note."""
-    note = get_note_by_id(keep, note_id)
+    note = get_note_by_id(keep, note_id, sync=sync)
     note.pinned = pinned
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def delete_note(keep, note_id):
+def delete_note(keep, note_id, sync=True):
     """Delete (trash) a note."""
-    note = get_note_by_id(keep, note_id)
+    note = get_note_by_id(keep, note_id, sync=sync)
     note.delete()
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return note
 
 
-def duplicate_note(keep, note_id, new_title=None):
+def duplicate_note(keep, note_id, new_title=None, sync=True):
     """
     Duplicate a note with a new title.
 
@@ -165,11 +357,12 @@ def duplicate_note(keep, note_id, new_title=None):
         keep: Authenticated Keep client
         note_id: ID of the note to duplicate
         new_title: Title for the new note (defaults to "Copy of [original title]")
+        sync: Sync with the server before and after duplicating (False to defer to a later sync)
 
     Returns:
         New duplicated note
     """
-    original = get_note_by_id(keep, note_id)
+    original = get_note_by_id(keep, note_id, sync=sync)
 
     # Determine new title
     if new_title is None:
@@ -178,9 +371,14 @@ def duplicate_note(keep, note_id, new_title=None):
     # Check if it's a list note
     if hasattr(original, "items") and original.items:
         # Duplicate as list
-        items = [{"text": item.text, "checked": item.checked} for item in sorted(original.items, key=lambda i: i.sort)]
+        items = [{"text": item.text, "checked": item.checked} for item in original.items]
         new_note = create_list_note(
-            keep, new_title, items, pinned=original.pinned, color=original.color.name if original.color else None
+            keep,
+            new_title,
+            items,
+            pinned=original.pinned,
+            color=original.color.name if original.color else None,
+            sync=False,
         )
     else:
         # Duplicate as text note
@@ -190,21 +388,252 @@ def duplicate_note(keep, note_id, new_title=None):
             original.text,
             pinned=original.pinned,
             color=original.color.name if original.color else None,
+            sync=False,
         )
 
     # Copy labels
     for label in original.labels.all():
         new_note.labels.add(label)
 
-    keep.sync()
+    if sync:
+        sync_keep(keep)
     return new_note
 
 
-def main():
+def duplicate_notes(keep, note_ids=None, query=None, new_title=None, sync=True):
+    """
+    Duplicate many notes in one in-memory pass, committed with a single sync.
+
+    Args:
+        keep: Authenticated Keep client
+        note_ids: IDs of the notes to duplicate (optional)
+        query: Search query selecting additional notes to duplicate (optional, see search_notes)
+        new_title: Title template for the copies; "{title}" is replaced by the original
+                   title (defaults to "Copy of {title}")
+        sync: Sync with the server before and after duplicating (False to defer to a later sync)
+
+    Returns:
+        dict: original note ID -> new note
+    """
+    from search_notes import search_notes
+
+    if query is not None and not parse_query(query):
+        raise ValueError(f"Query has no searchable terms: {query!r}")
+
+    if sync:
+        sync_keep(keep)
+
+    # Resolve every source before creating anything, so a bad ID aborts the whole batch
+    sources = [get_note_by_id(keep, note_id, sync=False) for note_id in note_ids or []]
+    if query:
+        sources.extend(search_notes(keep, query=query, sync=False))
+
+    copies = {}
+    for original in sources:
+        if original.id in copies:
+            continue
+        title = new_title.replace("{title}", original.title) if new_title else None
+        copies[original.id] = duplicate_note(keep, original.id, title, sync=False)
+
+    if sync:
+        sync_keep(keep)
+    return copies
+
+
+def export_notes(keep, archive_path, include_trashed=False, sync=True):
+    """
+    Export all notes to a compressed archive (see note_archive.write_archive).
+
+    Args:
+        keep: Authenticated Keep client
+        archive_path: Output file (e.g. notes.jsonl.gz)
+        include_trashed: Also export trashed notes
+        sync: Sync with the server first (False to export the local state as is)
+
+    Returns:
+        dict: The archive index
+    """
+    if sync:
+        sync_keep(keep)
+    return write_archive(keep.all(), archive_path, include_trashed)
+
+
+def import_notes(keep, archive_path, note_ids=None, sync=True):
+    """
+    Recreate notes from an archive, committed with a single sync.
+
+    Notes are always created as new notes (Keep assigns new IDs) with their
+    text or items, pin state, color, archive state and labels; trashed
+    records are skipped.
+
+    Args:
+        keep: Authenticated Keep client
+        archive_path: Archive written by export_notes
+        note_ids: Only import these original note IDs (optional)
+        sync: Sync with the server before and after importing (False to defer to a later sync)
+
+    Returns:
+        dict: original note ID -> new note ID
+    """
+    # Pull labels first so existing ones are reused instead of duplicated
+    if sync:
+        sync_keep(keep)
+
+    wanted = set(note_ids) if note_ids else None
+    id_map = {}
+
+    for record in read_archive(archive_path):
+        if wanted is not None and record["id"] not in wanted:
+            continue
+        if record.get("trashed"):
+            continue
+
+        pinned = record.get("pinned", False)
+        color = record.get("color")
+        if record.get("type") == "list":
+            note = create_list_note(keep, record["title"], record.get("items", []), pinned, color, sync=False)
+        else:
+            note = create_text_note(keep, record["title"], record.get("text", ""), pinned, color, sync=False)
+
+        if record.get("archived"):
+            note.archived = True
+
+        for name in record.get("labels", []):
+            note.labels.add(keep.findLabel(name, create=True))
+
+        id_map[record["id"]] = note.id
+
+    if sync:
+        sync_keep(keep)
+    return id_map
+
+
+BATCH_NOTE_ACTIONS = {"update", "archive", "unarchive", "pin", "unpin", "delete", "duplicate"}
+
+
+def apply_batch_action(keep, entry):
+    """
+    Apply one batch entry in memory, without syncing.
+
+    Args:
+        keep: Authenticated Keep client
+        entry: Dict with 'action' and the same fields as the CLI options
+               (title, text, items, pinned, color, note_id, new_title)
+
+    Returns:
+        Affected (or created) note
+    """
+    action = entry.get("action")
+    note_id = entry.get("note_id")
+
+    if action in BATCH_NOTE_ACTIONS and not note_id:
+        raise ValueError(f"'note_id' is required for action '{action}'")
+
+    if action == "create-text":
+        if not entry.get("title"):
+            raise ValueError("'title' is required for action 'create-text'")
+        return create_text_note(
+            keep, entry["title"], entry.get("text", ""), entry.get("pinned", False), entry.get("color"), sync=False
+        )
+    if action == "create-list":
+        if not entry.get("title"):
+            raise ValueError("'title' is required for action 'create-list'")
+        return create_list_note(
+            keep, entry["title"], entry.get("items", []), entry.get("pinned", False), entry.get("color"), sync=False
+        )
+    if action == "update":
+        return update_note(keep, note_id, entry.get("title"), entry.get("text"), entry.get("items"), sync=False)
+    if action in ("archive", "unarchive"):
+        return archive_note(keep, note_id, archived=action == "archive", sync=False)
+    if action in ("pin", "unpin"):
+        return pin_note(keep, note_id, pinned=action == "pin", sync=False)
+    if action == "delete":
+        return delete_note(keep, note_id, sync=False)
+    if action == "duplicate":
+        return duplicate_note(keep, note_id, entry.get("new_title"), sync=False)
+
+    raise ValueError(f"Unknown action: {action}")
+
+
+def apply_batch(keep, entries, sync=True):
+    """
+    Apply many actions in memory and commit them with a single sync.
+
+    Entries that fail (unknown note, missing field, ...) are reported and
+    skipped; the others are still committed.
+
+    Args:
+        keep: Authenticated Keep client
+        entries: List of (line_number, action dict) tuples (see apply_batch_action)
+        sync: Sync before and after the batch (False to defer to a later sync)
+
+    Returns:
+        List of result dicts, one per entry, in input order
+    """
+    # One sync to pull the latest notes, then everything happens in memory
+    if sync:
+        sync_keep(keep)
+
+    results = []
+    for line_number, entry in entries:
+        result = {"line": line_number, "action": entry.get("action")}
+        try:
+            note = apply_batch_action(keep, entry)
+            result.update({"status": "ok", "id": note.id, "title": note.title})
+        except Exception as e:
+            result.update({"status": "error", "error": str(e)})
+        results.append(result)
+
+    # Single commit for the whole batch
+    if sync:
+        sync_keep(keep)
+    return results
+
+
+def read_batch_file(path):
+    """
+    Read batch actions from a JSONL file ("-" for stdin).
+
+    Blank lines and lines starting with '#' are ignored.
+
+    Returns:
+        List of (line_number, entry) tuples
+    """
+    if path != "-" and not os.path.exists(path):
+        raise ValueError(f"Batch file not found: {path}")
+
+    stream = sys.stdin if path == "-" else open(path, "r")
+    try:
+        entries = []
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+            if not isinstance(entry, dict):
+                raise ValueError(f"Line {line_number} must be a JSON object")
+            entries.append((line_number, entry))
+        return entries
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv=None, keep=None, sync=True):
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
+        keep: Already authenticated Keep client to reuse (used by the daemon)
+        sync: Sync around each action (the daemon disables it and commits itself)
+    """
     parser = argparse.ArgumentParser(description="Manage Google Keep notes")
     parser.add_argument(
         "--action",
-        required=True,
         choices=[
             "create-text",
             "create-list",
@@ -216,28 +645,55 @@ def main():
             "delete",
             "duplicate",
             "get",
+            "export",
+            "import",
         ],
         help="Action to perform",
     )
-    parser.add_argument("--note-id", help="Note ID (required for update/archive/pin/delete/duplicate/get)")
+    parser.add_argument(
+        "--note-id",
+        help="Note ID (required for update/archive/pin/delete/get, optional filter for import); "
+        "comma-separated IDs for duplicate",
+    )
     parser.add_argument("--title", help="Note title")
     parser.add_argument("--text", help="Note text (for text notes)")
     parser.add_argument("--items", help="List items as JSON array (for list notes)")
     parser.add_argument("--pinned", action="store_true", help="Pin the note")
     parser.add_argument("--color", help="Note color (e.g., red, blue, green)")
-    parser.add_argument("--new-title", help="New title for duplicated note")
+    parser.add_argument(
+        "--new-title", help='New title for duplicated notes ("{title}" is replaced by the original title)'
+    )
+    parser.add_argument("--query", help="Duplicate every note matching this search query (see search_notes)")
+    parser.add_argument("--file", help="Archive file for export/import (e.g. notes.jsonl.gz)")
+    parser.add_argument("--include-trashed", action="store_true", help="Also export trashed notes")
+    parser.add_argument(
+        "--batch", metavar="FILE", help="JSONL file of actions to apply with a single sync ('-' for stdin)"
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    if not args.action and not args.batch:
+        parser.error("one of --action or --batch is required")
 
     try:
-        keep = get_keep_client()
+        if args.batch:
+            entries = read_batch_file(args.batch)
+            keep = keep or get_keep_client()
+            results = apply_batch(keep, entries, sync=sync)
+
+            failed = sum(1 for r in results if r["status"] == "error")
+            summary = {"applied": len(results) - failed, "failed": failed, "results": results}
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+            return
+
+        keep = keep or get_keep_client()
 
         if args.action == "create-text":
             if not args.title:
                 print("Error: --title is required for creating a text note")
                 return
 
-            note = create_text_note(keep, args.title, args.text or "", pinned=args.pinned, color=args.color)
+            note = create_text_note(keep, args.title, args.text or "", pinned=args.pinned, color=args.color, sync=sync)
             print(f"✓ Text note created: {note.title}")
             print(f"  ID: {note.id}")
 
@@ -250,7 +706,7 @@ def main():
             if args.items:
                 items = json.loads(args.items)
 
-            note = create_list_note(keep, args.title, items, pinned=args.pinned, color=args.color)
+            note = create_list_note(keep, args.title, items, pinned=args.pinned, color=args.color, sync=sync)
             print(f"✓ List note created: {note.title}")
             print(f"  ID: {note.id}")
             print(f"  Items: {len(items)}")
@@ -264,7 +720,7 @@ def main():
             if args.items:
                 items = json.loads(args.items)
 
-            note = update_note(keep, args.note_id, args.title, args.text, items)
+            note = update_note(keep, args.note_id, args.title, args.text, items, sync=sync)
             print(f"✓ Note updated: {note.title}")
 
         elif args.action == "archive":
@@ -272,7 +728,7 @@ def main():
                 print("Error: --note-id is required for archiving a note")
                 return
 
-            note = archive_note(keep, args.note_id, archived=True)
+            note = archive_note(keep, args.note_id, archived=True, sync=sync)
             print(f"✓ Note archived: {note.title}")
 
         elif args.action == "unarchive":
@@ -280,7 +736,7 @@ def main():
                 print("Error: --note-id is required for unarchiving a note")
                 return
 
-            note = archive_note(keep, args.note_id, archived=False)
+            note = archive_note(keep, args.note_id, archived=False, sync=sync)
             print(f"✓ Note unarchived: {note.title}")
 
         elif args.action == "pin":
@@ -288,7 +744,7 @@ def main():
                 print("Error: --note-id is required for pinning a note")
                 return
 
-            note = pin_note(keep, args.note_id, pinned=True)
+            note = pin_note(keep, args.note_id, pinned=True, sync=sync)
             print(f"✓ Note pinned: {note.title}")
 
         elif args.action == "unpin":
@@ -296,7 +752,7 @@ def main():
                 print("Error: --note-id is required for unpinning a note")
                 return
 
-            note = pin_note(keep, args.note_id, pinned=False)
+            note = pin_note(keep, args.note_id, pinned=False, sync=sync)
             print(f"✓ Note unpinned: {note.title}")
 
         elif args.action == "delete":
@@ -304,52 +760,59 @@ def main():
                 print("Error: --note-id is required for deleting a note")
                 return
 
-            note = delete_note(keep, args.note_id)
+            note = delete_note(keep, args.note_id, sync=sync)
             print(f"✓ Note deleted: {note.title}")
 
         elif args.action == "duplicate":
-            if not args.note_id:
-                print("Error: --note-id is required for duplicating a note")
+            if not args.note_id and not args.query:
+                print("Error: --note-id or --query is required for duplicating notes")
                 return
 
-            note = duplicate_note(keep, args.note_id, args.new_title)
-            print(f"✓ Note duplicated: {note.title}")
-            print(f"  New ID: {note.id}")
+            note_ids = args.note_id.split(",") if args.note_id else []
+
+            # Single note: keep the simple human-readable output
+            if len(note_ids) == 1 and not args.query:
+                note = duplicate_note(keep, note_ids[0], args.new_title, sync=sync)
+                print(f"✓ Note duplicated: {note.title}")
+                print(f"  New ID: {note.id}")
+                return
+
+            copies = duplicate_notes(keep, note_ids, query=args.query, new_title=args.new_title, sync=sync)
+            mapping = [
+                {"original_id": original_id, "new_id": note.id, "title": note.title}
+                for original_id, note in copies.items()
+            ]
+            print(json.dumps({"duplicated": len(mapping), "notes": mapping}, indent=2, ensure_ascii=False))
 
         elif args.action == "get":
             if not args.note_id:
                 print("Error: --note-id is required for getting a note")
                 return
 
-            note = get_note_by_id(keep, args.note_id)
-
-            # Format full note data
-            data = {
-                "id": note.id,
-                "title": note.title,
-                "text": note.text,
-                "pinned": note.pinned,
-                "archived": note.archived,
-                "trashed": note.trashed,
-                "color": note.color.name if note.color else None,
-                "labels": [label.name for label in note.labels.all()],
-                "created": note.timestamps.created.isoformat(),
-                "updated": note.timestamps.updated.isoformat(),
-            }
-
-            # Add list items if it's a list note
-            if hasattr(note, "items") and note.items:
-                data["type"] = "list"
-                data["items"] = [
-                    {"text": item.text, "checked": item.checked, "sort": item.sort}
-                    for item in sorted(note.items, key=lambda i: i.sort)
-                ]
-            else:
-                data["type"] = "text"
+            note = get_note_by_id(keep, args.note_id, sync=sync)
 
+            data = format_note_full(note)
             print(json.dumps(data, indent=2))
 
-    except FileNotFoundError as e:
+        elif args.action == "export":
+            if not args.file:
+                print("Error: --file is required for exporting notes")
+                return
+
+            index = export_notes(keep, args.file, include_trashed=args.include_trashed, sync=sync)
+            print(f"✓ {index['count']} note(s) exported to: {args.file}")
+            print(f"  Index: {get_archive_index_path(args.file)}")
+
+        elif args.action == "import":
+            if not args.file:
+                print("Error: --file is required for importing notes")
+                return
+
+            note_ids = [args.note_id] if args.note_id else None
+            id_map = import_notes(keep, args.file, note_ids=note_ids, sync=sync)
+            print(json.dumps({"imported": len(id_map), "ids": id_map}, indent=2))
+
+    except CredentialsNotFoundError as e:
         print(f"✗ {e}")
         print("\nTo set up authentication, run:")
         print("  cd ~/.claude/skills/note-manager/scripts")
@@ -359,4 +822,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if not forward_to_daemon("manage_notes", sys.argv[1:]):
+        main()
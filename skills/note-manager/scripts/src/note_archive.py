@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Offline export/import of Google Keep notes
+Compressed JSONL archives with a sidecar index
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from note_serializer import format_note_full
+
+ARCHIVE_VERSION = 1
+
+
+def get_archive_index_path(archive_path):
+    """Get path to the index written next to an archive."""
+    return f"{archive_path}.index.json"
+
+
+def write_archive(notes, archive_path, include_trashed=False):
+    """
+    Write notes to a gzip-compressed JSONL archive.
+
+    Each line is one note (same fields as `manage_notes --action get`). An
+    index (<archive>.index.json) lists every note with its line number,
+    title, labels and timestamps, so a snapshot can be browsed without
+    decompressing it or touching the network.
+
+    Args:
+        notes: Notes to export
+        archive_path: Output file (e.g. notes.jsonl.gz)
+        include_trashed: Also export trashed notes
+
+    Returns:
+        dict: The archive index
+    """
+    archive_dir = os.path.dirname(os.path.abspath(archive_path))
+    if not os.path.isdir(archive_dir):
+        raise ValueError(f"Cannot write archive {archive_path}: directory not found: {archive_dir}")
+
+    entries = []
+    with gzip.open(archive_path, "wt", encoding="utf-8") as f:
+        for note in notes:
+            if note.trashed and not include_trashed:
+                continue
+
+            record = format_note_full(note)
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            entries.append(
+                {
+                    "line": len(entries) + 1,
+                    "id": record["id"],
+                    "title": record["title"],
+                    "type": record["type"],
+                    "labels": record["labels"],
+                    "pinned": record["pinned"],
+                    "archived": record["archived"],
+                    "trashed": record["trashed"],
+                    "updated": record["updated"],
+                }
+            )
+
+    index = {
+        "version": ARCHIVE_VERSION,
+        "exported": datetime.now(timezone.utc).isoformat(),
+        "count": len(entries),
+        "notes": entries,
+    }
+    with open(get_archive_index_path(archive_path), "w") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+
+    return index
+
+
+def read_archive(archive_path):
+    """
+    Stream note records from an archive.
+
+    Concatenated archives (e.g. `cat a.jsonl.gz b.jsonl.gz`) are read as one.
+
+    Yields:
+        dict: One note record per line
+    """
+    if not os.path.exists(archive_path):
+        raise ValueError(f"Archive not found: {archive_path}")
+
+    with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
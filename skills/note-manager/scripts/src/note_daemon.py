@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Google Keep note-manager daemon
+Keeps one authenticated, synced Keep client warm and serves the CLI scripts over a Unix socket
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+DEFAULT_SYNC_INTERVAL = 120
+
+# Scripts the daemon is allowed to run, and whether their actions must be committed afterwards
+SERVED_SCRIPTS = {"search_notes": False, "manage_notes": True}
+
+
+def get_socket_path():
+    """Get path to the daemon Unix socket."""
+    return os.path.expanduser("~/.claude/credentials/gkeep_daemon.sock")
+
+
+def send_request(request, timeout=None):
+    """
+    Send one JSON request to the daemon and return its JSON response.
+
+    Args:
+        request: Request dict
+        timeout: Socket timeout in seconds (None to wait for the answer)
+
+    Returns:
+        dict: Response, or None if the daemon is not running
+    """
+    socket_path = get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def forward_to_daemon(script, argv):
+    """
+    Run a CLI invocation through the daemon if it is running.
+
+    Args:
+        script: Script name (e.g. "search_notes")
+        argv: Command-line arguments
+
+    Returns:
+        bool: True if the daemon handled the call, False to run it locally
+    """
+    # The daemon cannot read this process' stdin (e.g. --batch -)
+    if "-" in argv:
+        return False
+
+    response = send_request({"command": "run", "script": script, "argv": argv, "cwd": os.getcwd()})
+    if response is None:
+        return False
+
+    sys.stdout.write(response.get("output", ""))
+    sys.stderr.write(response.get("error_output", ""))
+    if response.get("exit_code"):
+        sys.exit(response["exit_code"])
+    return True
+
+
+class NoteRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON request per connection"""
+
+    def handle(self):
+        """Read a request line, dispatch it and write the JSON response"""
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.dispatch(request)
+        except Exception as e:
+            response = {"output": "", "error_output": f"✗ Daemon error: {e}\n", "exit_code": 1}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class NoteDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server sharing one warm Keep client between requests"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, keep, sync_interval):
+        super().__init__(socket_path, NoteRequestHandler)
+        os.chmod(socket_path, 0o600)
+        self.keep = keep
+        self.sync_interval = sync_interval
+        # gkeepapi is not thread-safe: requests and background syncs take turns
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def dispatch(self, request):
+        """Execute a request and return the response dict"""
+        command = request.get("command")
+
+        if command == "status":
+            with self.lock:
+                count = len(self.keep.all())
+            return {"output": f"✓ Daemon running (pid {os.getpid()}, {count} notes)\n", "exit_code": 0}
+
+        if command == "stop":
+            self.stopping.set()
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"output": "✓ Daemon stopped\n", "exit_code": 0}
+
+        if command == "run":
+            return self.run_script(request.get("script"), request.get("argv", []), request.get("cwd"))
+
+        raise ValueError(f"Unknown command: {command}")
+
+    def run_script(self, script, argv, cwd):
+        """Run a CLI script's main() against the shared client, capturing its output"""
+        from auth import sync_keep
+
+        if script not in SERVED_SCRIPTS:
+            raise ValueError(f"Unknown script: {script}")
+        entry_point = importlib.import_module(script).main
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        exit_code = 0
+
+        with self.lock:
+            # Relative paths (e.g. --batch FILE) are resolved from the client's directory
+            if cwd:
+                os.chdir(cwd)
+
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    entry_point(argv, keep=self.keep, sync=False)
+                    if SERVED_SCRIPTS[script]:
+                        sync_keep(self.keep)
+                except SystemExit as e:
+                    # argparse errors and --help
+                    exit_code = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(f"✗ Error: {e}")
+                    exit_code = 1
+
+        return {"output": stdout.getvalue(), "error_output": stderr.getvalue(), "exit_code": exit_code}
+
+    def background_sync(self):
+        """Periodically pull remote changes so reads never wait for the network"""
+        from auth import sync_keep
+
+        while not self.stopping.wait(self.sync_interval):
+            try:
+                with self.lock:
+                    sync_keep(self.keep)
+            except Exception as e:
+                print(f"Warning: background sync failed: {e}", file=sys.stderr)
+
+
+def serve(sync_interval=DEFAULT_SYNC_INTERVAL):
+    """
+    Start the daemon in the foreground.
+
+    Args:
+        sync_interval: Seconds between background syncs
+    """
+    from auth import get_keep_client, sync_keep
+
+    socket_path = get_socket_path()
+
+    # Refuse to start twice; clean up the socket of a daemon that died
+    if send_request({"command": "status"}, timeout=5) is not None:
+        raise RuntimeError(f"Daemon already running on {socket_path}")
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    print("Authenticating and syncing...")
+    keep = get_keep_client()
+    sync_keep(keep)
+
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+    server = NoteDaemon(socket_path, keep, sync_interval)
+    threading.Thread(target=server.background_sync, daemon=True).start()
+
+    print(f"✓ Daemon listening on {socket_path} (sync every {sync_interval}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopping.set()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google Keep note-manager daemon")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    parser.add_argument("--status", action="store_true", help="Show whether the daemon is running")
+    parser.add_argument(
+        "--sync-interval", type=int, default=DEFAULT_SYNC_INTERVAL, help="Seconds between background syncs"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.stop or args.status:
+            response = send_request({"command": "stop" if args.stop else "status"}, timeout=30)
+            if response is None:
+                print("Daemon not running")
+                return
+            print(response["output"], end="")
+            return
+
+        serve(sync_interval=args.sync_interval)
+
+    except FileNotFoundError as e:
+        print(f"✗ {e}")
+        print("\nTo set up authentication, run:")
+        print("  cd ~/.claude/skills/note-manager/scripts")
+        print("  ./run.sh auth")
+    except Exception as e:
+        print(f"✗ Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
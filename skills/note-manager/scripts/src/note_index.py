@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Full-text index for Google Keep notes
+Persistent inverted index with AND/OR queries, prefix matches and BM25 scoring
+"""
+
+import bisect
+import json
+import math
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title terms count more than body terms
+TITLE_WEIGHT = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_index_path():
+    """Get path to the local search index."""
+    return os.path.expanduser("~/.claude/credentials/gkeep_index.json")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase, accent-insensitive tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in normalized if not unicodedata.combining(c))
+    return TOKEN_PATTERN.findall(stripped)
+
+
+def empty_index():
+    """Create an empty index."""
+    return {"version": INDEX_VERSION, "docs": {}, "postings": {}, "total_length": 0}
+
+
+# Last index loaded or saved by this process, reused while the file is unchanged (daemon)
+_loaded_index = {"mtime": None, "index": None}
+
+
+def load_index():
+    """
+    Load the search index from disk.
+
+    Returns:
+        dict: Index, or an empty index if missing or unreadable
+    """
+    index_path = get_index_path()
+    if not os.path.exists(index_path):
+        return empty_index()
+
+    mtime = os.stat(index_path).st_mtime_ns
+    if _loaded_index["mtime"] == mtime:
+        return _loaded_index["index"]
+
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return empty_index()
+
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return empty_index()
+
+    _loaded_index.update(mtime=mtime, index=index)
+    return index
+
+
+def save_index(index):
+    """Save the search index to disk (0600, atomic replace)."""
+    index_path = get_index_path()
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = f"{index_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    _loaded_index.update(mtime=os.stat(index_path).st_mtime_ns, index=index)
+
+
+def _remove_doc(index, note_id):
+    """Remove a note and its postings from the index."""
+    doc = index["docs"].pop(note_id, None)
+    if doc is None:
+        return
+
+    index["total_length"] -= doc["length"]
+    for term in doc["terms"]:
+        postings = index["postings"].get(term)
+        if postings is None:
+            continue
+        postings.pop(note_id, None)
+        if not postings:
+            del index["postings"][term]
+
+
+def _add_doc(index, note):
+    """Tokenize a note and add its postings to the index."""
+    frequencies = {}
+    for token in tokenize(note.title):
+        frequencies[token] = frequencies.get(token, 0) + TITLE_WEIGHT
+    for token in tokenize(note.text):
+        frequencies[token] = frequencies.get(token, 0) + 1
+
+    length = sum(frequencies.values())
+    index["docs"][note.id] = {
+        "updated": note.timestamps.updated.isoformat(),
+        "length": length,
+        "terms": list(frequencies),
+    }
+    index["total_length"] += length
+
+    for term, frequency in frequencies.items():
+        index["postings"].setdefault(term, {})[note.id] = frequency
+
+
+def update_index(index, notes):
+    """
+    Bring the index in line with the synced notes.
+
+    Only notes whose updated timestamp changed are re-tokenized; notes no
+    longer present are dropped.
+
+    Args:
+        index: Index to update in place
+        notes: All notes from the Keep client
+
+    Returns:
+        bool: True if the index changed
+    """
+    changed = False
+    seen = set()
+
+    for note in notes:
+        seen.add(note.id)
+        doc = index["docs"].get(note.id)
+        if doc is not None and doc["updated"] == note.timestamps.updated.isoformat():
+            continue
+
+        _remove_doc(index, note.id)
+        _add_doc(index, note)
+        changed = True
+
+    for note_id in [note_id for note_id in index["docs"] if note_id not in seen]:
+        _remove_doc(index, note_id)
+        changed = True
+
+    return changed
+
+
+def parse_query(query):
+    """
+    Parse a query into OR-ed groups of AND-ed terms.
+
+    Terms separated by spaces must all match; the uppercase keyword OR
+    separates alternatives. A trailing * makes a term a prefix match.
+
+    Example: "budget 2025 OR fact*" -> [[("budget", False), ("2025", False)], [("fact", True)]]
+
+    Args:
+        query: Query string
+
+    Returns:
+        List of groups, each a list of (term, is_prefix) tuples
+    """
+    groups = [[]]
+
+    for word in query.split():
+        if word == "OR":
+            groups.append([])
+            continue
+
+        tokens = tokenize(word)
+        is_prefix = word.endswith("*")
+        for i, token in enumerate(tokens):
+            groups[-1].append((token, is_prefix and i == len(tokens) - 1))
+
+    return [group for group in groups if group]
+
+
+def _expand_term(index, vocabulary, term, is_prefix):
+    """Return the indexed terms matched by a query term."""
+    if not is_prefix:
+        return [term] if term in index["postings"] else []
+
+    start = bisect.bisect_left(vocabulary, term)
+    matches = []
+    for candidate in vocabulary[start:]:
+        if not candidate.startswith(term):
+            break
+        matches.append(candidate)
+    return matches
+
+
+def search_index(index, query):
+    """
+    Find notes matching a query and score them with BM25.
+
+    Args:
+        index: Loaded index
+        query: Query string (see parse_query)
+
+    Returns:
+        dict: note_id -> score for matching notes, or None if the query has no terms
+    """
+    groups = parse_query(query)
+    if not groups:
+        return None
+
+    docs = index["docs"]
+    doc_count = len(docs)
+    if not doc_count:
+        return {}
+
+    average_length = index["total_length"] / doc_count or 1
+    vocabulary = sorted(index["postings"]) if any(p for group in groups for _, p in group) else []
+
+    results = {}
+    for group in groups:
+        group_scores = None
+
+        for term, is_prefix in group:
+            term_scores = {}
+            for matched in _expand_term(index, vocabulary, term, is_prefix):
+                postings = index["postings"][matched]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for note_id, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * docs[note_id]["length"] / average_length)
+                    score = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    term_scores[note_id] = term_scores.get(note_id, 0) + score
+
+            # AND within a group: keep only notes matching every term
+            if group_scores is None:
+                group_scores = term_scores
+            else:
+                group_scores = {
+                    note_id: score + term_scores[note_id]
+                    for note_id, score in group_scores.items()
+                    if note_id in term_scores
+                }
+
+            if not group_scores:
+                break
+
+        # OR across groups: a note's score is its best group score
+        for note_id, score in (group_scores or {}).items():
+            if score > results.get(note_id, 0):
+                results[note_id] = score
+
+    return results
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Google Keep note serialization
+Shared, memoized JSON representation of notes for search_notes and manage_notes
+"""
+
+SUMMARY_TEXT_LENGTH = 200
+
+# note_id -> [updated timestamp, full dict, summary dict or None]
+_cache = {}
+
+
+def _serialize(note):
+    """Build the full representation of a note."""
+    data = {
+        "id": note.id,
+        "title": note.title,
+        "text": note.text,
+        "pinned": note.pinned,
+        "archived": note.archived,
+        "trashed": note.trashed,
+        "color": note.color.name if note.color else None,
+        "labels": [label.name for label in note.labels.all()],
+        "created": note.timestamps.created.isoformat(),
+        "updated": note.timestamps.updated.isoformat(),
+    }
+
+    if hasattr(note, "items") and note.items:
+        data["type"] = "list"
+        # note.items is in display order (highest sort value first)
+        data["items"] = [{"text": item.text, "checked": item.checked, "sort": item.sort} for item in note.items]
+    else:
+        data["type"] = "text"
+
+    return data
+
+
+def _cache_entry(note):
+    """Return the cache entry for a note, rebuilding it if the note changed."""
+    # Local edits not yet synced do not always bump the updated timestamp
+    if note.dirty:
+        _cache.pop(note.id, None)
+        return [None, _serialize(note), None]
+
+    updated = note.timestamps.updated
+    entry = _cache.get(note.id)
+    if entry is None or entry[0] != updated:
+        entry = [updated, _serialize(note), None]
+        _cache[note.id] = entry
+    return entry
+
+
+def format_note_full(note):
+    """
+    Format a note with full details (full text, list items).
+
+    The result is cached per note until its updated timestamp changes;
+    callers must not modify the returned dict.
+    """
+    return _cache_entry(note)[1]
+
+
+def format_note_summary(note):
+    """
+    Format a note as a summary (truncated text, no list items).
+
+    The result is cached per note until its updated timestamp changes;
+    callers must not modify the returned dict.
+    """
+    entry = _cache_entry(note)
+    if entry[2] is None:
+        full = entry[1]
+        summary = {key: value for key, value in full.items() if key != "items"}
+        if len(full["text"]) > SUMMARY_TEXT_LENGTH:
+            summary["text"] = full["text"][:SUMMARY_TEXT_LENGTH] + "..."
+        # Search results have always labelled text notes as "note"
+        summary["type"] = "list" if full["type"] == "list" else "note"
+        entry[2] = summary
+    return entry[2]
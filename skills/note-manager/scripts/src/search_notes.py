@@ -5,107 +5,128 @@ Provides search functionality with pinned notes first
 """
 
 import argparse
+import heapq
 import json
-from auth import get_keep_client
+import sys
+from auth import get_keep_client, sync_keep
+from note_daemon import forward_to_daemon
+from note_index import load_index, parse_query, save_index, search_index, update_index
+from note_serializer import format_note_full, format_note_summary
 
 
-def search_notes(keep, query="", include_archived=False, include_trashed=False):
+def search_notes(keep, query="", include_archived=False, include_trashed=False, rank=False, sync=True, limit=None):
     """
     Search notes in Google Keep.
 
     Args:
         keep: Authenticated Keep client
-        query: Search query string
+        query: Search query (terms are AND-ed, "OR" separates alternatives, "term*" matches a prefix)
         include_archived: Include archived notes
         include_trashed: Include trashed notes
+        rank: Sort by relevance (BM25) instead of pinned status
+        sync: Sync with the server first (False to search the local state as is)
+        limit: Only return the first `limit` notes (top-k selection instead of a full sort)
 
     Returns:
-        List of notes sorted by pinned status (pinned first)
+        List of notes sorted by pinned status (pinned first), or by relevance if rank is set;
+        empty if the query has no searchable terms (e.g. "*")
     """
-    # Sync with server
-    keep.sync()
-
-    # Get all notes
-    all_notes = keep.all()
-
-    # Filter notes
-    filtered_notes = []
-    for note in all_notes:
-        # Skip trashed notes unless requested
-        if note.trashed and not include_trashed:
-            continue
-
-        # Skip archived notes unless requested
-        if note.archived and not include_archived:
-            continue
-
-        # Apply query filter if provided
-        if query:
-            query_lower = query.lower()
-            title_match = query_lower in note.title.lower()
-            text_match = query_lower in note.text.lower()
-
-            if not (title_match or text_match):
-                continue
-
-        filtered_notes.append(note)
-
-    # Sort by pinned status (pinned first), then by modification time
-    sorted_notes = sorted(filtered_notes, key=lambda n: (not n.pinned, n.timestamps.updated), reverse=True)
-
-    return sorted_notes
-
-
-def format_note_summary(note):
-    """Format note as summary dict."""
-    return {
-        "id": note.id,
-        "title": note.title,
-        "text": note.text[:200] + "..." if len(note.text) > 200 else note.text,
-        "pinned": note.pinned,
-        "archived": note.archived,
-        "trashed": note.trashed,
-        "color": note.color.name if note.color else None,
-        "labels": [label.name for label in note.labels.all()],
-        "created": note.timestamps.created.isoformat(),
-        "updated": note.timestamps.updated.isoformat(),
-        "type": "list" if hasattr(note, "items") and note.items else "note",
-    }
-
-
-def format_note_full(note):
-    """Format note with full details."""
-    data = format_note_summary(note)
-
-    # Add list items if it's a list note
-    if hasattr(note, "items") and note.items:
-        data["items"] = [
-            {"text": item.text, "checked": item.checked, "sort": item.sort}
-            for item in sorted(note.items, key=lambda i: i.sort)
-        ]
-
-    return data
+    # A query without any word matches nothing (not every note)
+    if query and not parse_query(query):
+        return []
 
+    # Sync with server
+    if sync:
+        sync_keep(keep)
+
+    # Bring the full-text index up to date with the synced notes
+    scores = None
+    if query:
+        index = load_index()
+        if update_index(index, keep.all()):
+            save_index(index)
+        scores = search_index(index, query)
+
+    # Candidate notes: index hits, or every note when there is no query
+    if scores is None:
+        candidates = keep.all()
+    else:
+        candidates = (keep.get(note_id) for note_id in scores)
+
+    # Filter lazily so top-k selection never materializes every match
+    # (trashed/archived notes are skipped unless requested)
+    filtered_notes = (
+        note
+        for note in candidates
+        if note is not None and (include_trashed or not note.trashed) and (include_archived or not note.archived)
+    )
+
+    if rank and scores is not None:
+        key = lambda n: (scores[n.id], n.timestamps.updated)
+    else:
+        # Pinned first, then most recently modified
+        key = lambda n: (n.pinned, n.timestamps.updated)
+
+    if limit is None:
+        return sorted(filtered_notes, key=key, reverse=True)
+    return heapq.nlargest(limit, filtered_notes, key=key)
+
+
+def main(argv=None, keep=None, sync=True):
+    """
+    Command-line entry point.
 
-def main():
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
+        keep: Already authenticated Keep client to reuse (used by the daemon)
+        sync: Sync before searching (the daemon keeps its client synced in the background)
+    """
     parser = argparse.ArgumentParser(description="Search Google Keep notes")
-    parser.add_argument("--query", default="", help="Search query (searches in title and text)")
+    parser.add_argument(
+        "--query",
+        default="",
+        help='Search query in title and text: words are AND-ed, "OR" separates alternatives, "word*" matches a prefix',
+    )
     parser.add_argument("--include-archived", action="store_true", help="Include archived notes")
     parser.add_argument("--include-trashed", action="store_true", help="Include trashed notes")
     parser.add_argument("--full", action="store_true", help="Show full note details including list items")
     parser.add_argument("--max-results", type=int, default=50, help="Maximum number of results")
+    parser.add_argument("--offset", type=int, default=0, help="Number of results to skip (pagination)")
+    parser.add_argument(
+        "--format",
+        choices=["text", "jsonl"],
+        default="text",
+        help="Output format: text (default) or jsonl (one JSON note per line, streamed)",
+    )
+    parser.add_argument("--rank", action="store_true", help="Sort results by relevance instead of pinned status")
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    if args.offset < 0:
+        parser.error("--offset must be >= 0")
 
     try:
-        keep = get_keep_client()
+        keep = keep or get_keep_client()
 
         notes = search_notes(
-            keep, query=args.query, include_archived=args.include_archived, include_trashed=args.include_trashed
+            keep,
+            query=args.query,
+            include_archived=args.include_archived,
+            include_trashed=args.include_trashed,
+            rank=args.rank,
+            sync=sync,
+            limit=args.offset + args.max_results,
         )
 
-        # Limit results
-        notes = notes[: args.max_results]
+        # Current page
+        notes = notes[args.offset :]
+
+        # Streaming mode: one JSON document per line, written as it is produced
+        if args.format == "jsonl":
+            formatter = format_note_full if args.full else format_note_summary
+            for note in notes:
+                sys.stdout.write(json.dumps(formatter(note), ensure_ascii=False) + "\n")
+            return
 
         if not notes:
             print("No notes found")
@@ -118,7 +139,7 @@ def main():
             results = [format_note_full(note) for note in notes]
             print(json.dumps(results, indent=2))
         else:
-            for i, note in enumerate(notes, 1):
+            for i, note in enumerate(notes, args.offset + 1):
                 pin_indicator = "📌 " if note.pinned else "   "
                 archived_indicator = "[ARCHIVED] " if note.archived else ""
                 title = note.title or "(No title)"
@@ -140,4 +161,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if not forward_to_daemon("search_notes", sys.argv[1:]):
+        main()
@@ -4,20 +4,31 @@ Office 365 Manager - Email and Calendar Management Tool
 Uses OAuth 2.1 PKCE for authentication with Microsoft Graph API
 """
 
+import fcntl
 import json
 import os
 import sys
 import webbrowser
-import subprocess
 import re
 from pathlib import Path
+from contextlib import contextmanager
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import hashlib
 import base64
 import secrets
+import itertools
+import heapq
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 # Configuration
 CLIENT_ID = "76d42bf5-d461-4274-bd4d-a02576b9df36"
@@ -32,9 +43,64 @@ SCOPES = [
 ]
 
 TOKEN_FILE = Path.home() / ".claude" / "credentials" / "o365_tokens.json"
+TOKEN_LOCK_FILE = Path.home() / ".claude" / "credentials" / "o365_tokens.lock"
+STORE_FILE = Path.home() / ".claude" / "credentials" / "o365_store.db"
+FOLDER_CACHE_FILE = Path.home() / ".claude" / "credentials" / "o365_folders.json"
 AUTHORITY = f"https://login.microsoftonline.com/{TENANT_ID}"
 GRAPH_API_ENDPOINT = "https://graph.microsoft.com/v1.0"
 
+# HTTP connection pool (one keep-alive connection per concurrent request to Graph)
+HTTP_POOL_SIZE = 10
+HTTP_MAX_RETRIES = 3
+HTTP_TIMEOUT = 60
+
+# Maximum number of requests in one Graph JSON batch
+GRAPH_BATCH_SIZE = 20
+
+# Items requested per page when following @odata.nextLink
+GRAPH_PAGE_SIZE = 100
+
+# Attachments are sent inline (base64 in the message) while their total size stays under
+# this budget (Graph rejects requests over 4 MB once encoded); the others are added to a draft
+INLINE_ATTACHMENT_LIMIT = 2_500_000
+
+# Graph only accepts upload sessions for files of 3 MB to 150 MB; smaller ones are posted whole
+UPLOAD_SESSION_MIN_SIZE = 3 * 1024 * 1024
+
+# Upload session chunk size (Graph requires a multiple of 320 KiB)
+UPLOAD_CHUNK_SIZE = 10 * 320 * 1024
+
+# Attachment downloads are written to disk this many bytes at a time
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Parallel Graph calls (Outlook allows 4 concurrent requests per app and mailbox)
+GRAPH_MAX_CONCURRENCY = 4
+
+# Status codes Graph uses for throttling, retried after the Retry-After delay
+THROTTLE_STATUSES = (429, 503)
+
+# Requests refresh the access token when it expires in less than this (seconds)
+TOKEN_REFRESH_MARGIN = 300
+
+# The background refresh starts this long before the access token expires (seconds)
+TOKEN_BACKGROUND_REFRESH = 600
+
+# Shared HTTP session, created on first use
+_session = None
+
+# Guards the shared session and throttling state when requests run in parallel
+_client_lock = threading.RLock()
+
+# Time before which no request is sent, after Graph throttled one of them
+_throttled_until = 0.0
+
+# Mail folder name -> ID cache lifetime (seconds); unknown names always trigger a refresh
+FOLDER_CACHE_TTL = 24 * 3600
+
+# In-memory copy of the folder cache, and the lock serializing its refresh
+_folder_cache = None
+_folder_lock = threading.Lock()
+
 
 class OAuth2CallbackHandler(BaseHTTPRequestHandler):
     """Handle OAuth2 callback"""
@@ -95,6 +161,34 @@ def get_auth_code(code_challenge):
     return server.auth_code
 
 
+def get_session():
+    """
+    Get the shared HTTP session
+
+    Reusing one session keeps TCP/TLS connections to Graph alive between calls.
+    Connection failures and transient server errors (500, 502, 504) on idempotent
+    requests are retried with exponential backoff. Throttling (429, 503) is
+    handled by make_graph_request.
+    """
+    global _session
+
+    with _client_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_MAX_RETRIES,
+                backoff_factor=1,
+                status_forcelist=[500, 502, 504],
+                allowed_methods=["GET", "PATCH", "DELETE"],
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+
+    return _session
+
+
 def get_tokens(auth_code, code_verifier):
     """Exchange authorization code for tokens"""
     token_url = f"{AUTHORITY}/oauth2/v2.0/token"
@@ -107,7 +201,7 @@ def get_tokens(auth_code, code_verifier):
         "code_verifier": code_verifier,
     }
 
-    response = requests.post(token_url, data=data)
+    response = get_session().post(token_url, data=data, timeout=HTTP_TIMEOUT)
     response.raise_for_status()
 
     return response.json()
@@ -119,18 +213,20 @@ def refresh_access_token(refresh_token):
 
     data = {"client_id": CLIENT_ID, "grant_type": "refresh_token", "refresh_token": refresh_token}
 
-    response = requests.post(token_url, data=data)
+    response = get_session().post(token_url, data=data, timeout=HTTP_TIMEOUT)
     response.raise_for_status()
 
     return response.json()
 
 
 def save_tokens(tokens):
-    """Save tokens to file"""
+    """Save tokens to file (0600, atomic replace so other processes never read a partial file)"""
     TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(TOKEN_FILE, "w") as f:
+    tmp_file = TOKEN_FILE.with_suffix(".tmp")
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
         json.dump(tokens, f, indent=2)
-    os.chmod(TOKEN_FILE, 0o600)
+    os.replace(tmp_file, TOKEN_FILE)
 
 
 def load_tokens():
@@ -141,75 +237,211 @@ def load_tokens():
     return None
 
 
+def is_token_fresh(tokens, margin=TOKEN_REFRESH_MARGIN):
+    """Check whether the access token is still valid for at least margin seconds"""
+    return bool(tokens) and "expires_at" in tokens and time.time() < tokens["expires_at"] - margin
+
+
+@contextmanager
+def token_file_lock():
+    """Hold an exclusive lock on the token file, shared by all o365_manager processes"""
+    TOKEN_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(TOKEN_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def authenticate():
+    """Run the interactive PKCE flow and save the new tokens"""
+    code_verifier, code_challenge = generate_pkce_pair()
+    auth_code = get_auth_code(code_challenge)
+
+    if not auth_code:
+        raise Exception("Failed to get authorization code")
+
+    tokens = get_tokens(auth_code, code_verifier)
+    tokens["expires_at"] = datetime.now().timestamp() + tokens["expires_in"]
+    save_tokens(tokens)
+    return tokens
+
+
+class TokenManager:
+    """
+    Hold the OAuth tokens in memory for the process lifetime
+
+    The token file is read once. A background timer refreshes the access token
+    TOKEN_BACKGROUND_REFRESH seconds before it expires, so requests normally
+    never wait for a refresh. Refreshes hold a file lock and re-read the file
+    first, so concurrent processes reuse each other's refresh instead of racing
+    (and overwriting each other's rotated refresh tokens).
+    """
+
+    def __init__(self):
+        self.tokens = None
+        self.lock = threading.RLock()
+        self.timer = None
+
+    def get_access_token(self):
+        """Get valid access token (refresh or authenticate if needed)"""
+        # Fast path: no locking while the token is valid
+        tokens = self.tokens
+        if is_token_fresh(tokens):
+            return tokens["access_token"]
+
+        with self.lock:
+            if self.tokens is None:
+                self.tokens = load_tokens()
+                self.schedule_refresh()
+
+            if not is_token_fresh(self.tokens):
+                self.refresh(interactive=True)
+
+            return self.tokens["access_token"]
+
+    def refresh(self, margin=TOKEN_REFRESH_MARGIN, interactive=False):
+        """
+        Refresh the tokens unless another process already did
+
+        Args:
+            margin: Tokens valid for more than margin seconds are kept as they are
+            interactive: Authenticate in the browser if there are no tokens or the refresh fails
+        """
+        with self.lock, token_file_lock():
+            tokens = load_tokens()
+
+            if is_token_fresh(tokens, margin):
+                # Refreshed by another process in the meantime
+                self.tokens = tokens
+
+            elif not tokens:
+                if not interactive:
+                    return
+                # New authentication required
+                print("No existing tokens found. Starting authentication...")
+                self.tokens = authenticate()
+                print("Authentication successful!")
+
+            else:
+                try:
+                    if interactive:
+                        print("Refreshing access token...", file=sys.stderr)
+                    new_tokens = refresh_access_token(tokens["refresh_token"])
+                    new_tokens["expires_at"] = datetime.now().timestamp() + new_tokens["expires_in"]
+                    new_tokens.setdefault("refresh_token", tokens["refresh_token"])
+                    save_tokens(new_tokens)
+                    self.tokens = new_tokens
+                    if interactive:
+                        print("Token refreshed successfully!", file=sys.stderr)
+                except Exception as e:
+                    if not interactive:
+                        raise
+                    # Re-authenticate if refresh fails
+                    print(f"Token refresh failed: {e}. Re-authenticating...", file=sys.stderr)
+                    self.tokens = authenticate()
+
+            self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """(Re)start the background timer refreshing the access token before it expires"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if not self.tokens or "expires_at" not in self.tokens:
+            return
+
+        delay = max(self.tokens["expires_at"] - TOKEN_BACKGROUND_REFRESH - time.time(), 0)
+        self.timer = threading.Timer(delay, self.background_refresh)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def background_refresh(self):
+        """Timer callback: refresh without ever prompting the user"""
+        try:
+            self.refresh(margin=TOKEN_BACKGROUND_REFRESH)
+        except Exception as e:
+            # The next request will refresh (or re-authenticate) in the foreground
+            print(f"Warning: background token refresh failed: {e}", file=sys.stderr)
+
+
+# Tokens of this process
+_token_manager = TokenManager()
+
+
 def get_access_token():
     """Get valid access token (refresh if needed)"""
-    tokens = load_tokens()
-
-    if not tokens:
-        # New authentication required
-        print("No existing tokens found. Starting authentication...")
-        code_verifier, code_challenge = generate_pkce_pair()
-        auth_code = get_auth_code(code_challenge)
-
-        if not auth_code:
-            raise Exception("Failed to get authorization code")
-
-        tokens = get_tokens(auth_code, code_verifier)
-        tokens["expires_at"] = datetime.now().timestamp() + tokens["expires_in"]
-        save_tokens(tokens)
-        print("Authentication successful!")
-        return tokens["access_token"]
-
-    # Check if token needs refresh (refresh if expires in less than 5 minutes)
-    if "expires_at" in tokens:
-        if datetime.now().timestamp() < tokens["expires_at"] - 300:
-            return tokens["access_token"]
+    return _token_manager.get_access_token()
+
 
-    # Refresh token
+def get_retry_after(headers, attempt):
+    """Get the delay requested by a throttled response (exponential backoff if absent)"""
     try:
-        print("Refreshing access token...", file=sys.stderr)
-        new_tokens = refresh_access_token(tokens["refresh_token"])
-        new_tokens["expires_at"] = datetime.now().timestamp() + new_tokens["expires_in"]
-        save_tokens(new_tokens)
-        print("Token refreshed successfully!", file=sys.stderr)
-        return new_tokens["access_token"]
-    except Exception as e:
-        # Re-authenticate if refresh fails
-        print(f"Token refresh failed: {e}. Re-authenticating...", file=sys.stderr)
-        code_verifier, code_challenge = generate_pkce_pair()
-        auth_code = get_auth_code(code_challenge)
+        return max(float(headers.get("Retry-After")), 0)
+    except (TypeError, ValueError):
+        return 2**attempt
 
-        if not auth_code:
-            raise Exception("Failed to get authorization code")
 
-        tokens = get_tokens(auth_code, code_verifier)
-        tokens["expires_at"] = datetime.now().timestamp() + tokens["expires_in"]
-        save_tokens(tokens)
-        return tokens["access_token"]
+def wait_for_throttle():
+    """Block until the throttling delay requested by Graph has elapsed"""
+    delay = _throttled_until - time.time()
+    if delay > 0:
+        time.sleep(delay)
 
 
-def make_graph_request(method, endpoint, data=None, params=None):
-    """Make authenticated request to Microsoft Graph API"""
-    access_token = get_access_token()
+def throttle(delay):
+    """Pause every request (in all threads) for delay seconds"""
+    global _throttled_until
 
-    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+    with _client_lock:
+        _throttled_until = max(_throttled_until, time.time() + delay)
 
-    url = f"{GRAPH_API_ENDPOINT}{endpoint}"
+
+def make_graph_request(method, endpoint, data=None, params=None, stream=False):
+    """
+    Make authenticated request to Microsoft Graph API
+
+    Throttled requests (429, 503) are retried up to HTTP_MAX_RETRIES times after
+    the Retry-After delay, during which parallel requests are paused as well.
+
+    With stream=True, the response is returned unread so the caller can consume
+    its body in chunks (and must close it).
+    """
+    # Absolute URLs are accepted for @odata.nextLink pages
+    url = endpoint if endpoint.startswith("https://") else f"{GRAPH_API_ENDPOINT}{endpoint}"
+
+    if method.upper() not in ("GET", "POST", "PATCH", "DELETE"):
+        raise ValueError(f"Unsupported method: {method}")
 
     try:
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data)
-        elif method.upper() == "PATCH":
-            response = requests.patch(url, headers=headers, json=data)
-        elif method.upper() == "DELETE":
-            response = requests.delete(url, headers=headers)
-        else:
-            raise ValueError(f"Unsupported method: {method}")
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            wait_for_throttle()
+
+            headers = {"Authorization": f"Bearer {get_access_token()}", "Content-Type": "application/json"}
+            response = get_session().request(
+                method.upper(),
+                url,
+                headers=headers,
+                params=params,
+                json=data if method.upper() in ("POST", "PATCH") else None,
+                timeout=HTTP_TIMEOUT,
+                stream=stream,
+            )
+            if response.status_code not in THROTTLE_STATUSES or attempt == HTTP_MAX_RETRIES:
+                break
+
+            response.close()
+            delay = get_retry_after(response.headers, attempt)
+            print(f"Throttled by Graph (HTTP {response.status_code}), retrying in {delay:g}s", file=sys.stderr)
+            throttle(delay)
 
         response.raise_for_status()
 
+        if stream:
+            return response
         if response.content:
             return response.json()
         return {}
@@ -222,48 +454,230 @@ def make_graph_request(method, endpoint, data=None, params=None):
         raise
 
 
+def iter_graph_items(endpoint, params=None):
+    """
+    Iterate over all items of a Graph collection, following @odata.nextLink
+
+    Pages are fetched lazily, so callers that stop early (e.g. with a limit)
+    never request the remaining pages.
+
+    Args:
+        endpoint: Collection endpoint (e.g. "/me/mailFolders/inbox/messages")
+        params: Query parameters for the first page ($top sets the page size)
+
+    Yields:
+        Raw Graph items (dicts)
+    """
+    result = make_graph_request("GET", endpoint, params=params)
+
+    while True:
+        yield from result.get("value", [])
+
+        # The next link already carries every query parameter
+        next_link = result.get("@odata.nextLink")
+        if not next_link:
+            return
+        result = make_graph_request("GET", next_link)
+
+
+def run_concurrently(tasks, max_workers=GRAPH_MAX_CONCURRENCY, return_exceptions=False):
+    """
+    Run independent calls in parallel with bounded concurrency
+
+    Args:
+        tasks: List of (function, args) tuples
+        max_workers: Maximum number of calls running at the same time
+        return_exceptions: Return exceptions in place of results instead of raising the first one
+
+    Returns:
+        List of results, in the same order as tasks
+    """
+
+    def call(func, args):
+        try:
+            return func(*args), None
+        except Exception as e:
+            return None, e
+
+    if len(tasks) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            outcomes = list(executor.map(lambda task: call(*task), tasks))
+    else:
+        outcomes = [call(func, args) for func, args in tasks]
+
+    results = []
+    for result, error in outcomes:
+        if error is not None:
+            if not return_exceptions:
+                raise error
+            result = error
+        results.append(result)
+    return results
+
+
+def send_graph_batch(chunk):
+    """
+    Send up to GRAPH_BATCH_SIZE requests in one $batch call
+
+    Requests throttled inside the batch are sent again after their Retry-After delay.
+
+    Returns:
+        List of dicts with 'status' and 'body', in the same order as chunk
+    """
+    responses = [None] * len(chunk)
+    pending = list(range(len(chunk)))
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        payload = {"requests": []}
+        for i in pending:
+            request = chunk[i]
+            item = {"id": str(i), "method": request["method"].upper(), "url": request["url"]}
+            if request.get("body") is not None:
+                item["body"] = request["body"]
+                item["headers"] = {"Content-Type": "application/json"}
+            payload["requests"].append(item)
+
+        result = make_graph_request("POST", "/$batch", data=payload)
+
+        # Responses may come back in any order
+        by_id = {item["id"]: item for item in result.get("responses", [])}
+        throttled = []
+        delay = 0
+        for i in pending:
+            item = by_id.get(str(i), {"status": 0, "body": {"error": {"message": "Missing response in batch"}}})
+            responses[i] = {"status": item.get("status", 0), "body": item.get("body") or {}}
+            if responses[i]["status"] in THROTTLE_STATUSES:
+                throttled.append(i)
+                delay = max(delay, get_retry_after(item.get("headers") or {}, attempt))
+
+        if not throttled or attempt == HTTP_MAX_RETRIES:
+            break
+
+        print(f"Throttled by Graph ({len(throttled)} batched requests), retrying in {delay:g}s", file=sys.stderr)
+        throttle(delay)
+        pending = throttled
+
+    return responses
+
+
+def make_graph_batch(batch_requests):
+    """
+    Send requests through the Microsoft Graph JSON batching endpoint ($batch)
+
+    Requests are grouped GRAPH_BATCH_SIZE at a time, so N independent calls
+    cost N / 20 round-trips instead of N. Batches are sent one after another:
+    Graph runs the requests of a batch concurrently, so parallel batches would
+    exceed Outlook's per-mailbox concurrency limit and be throttled.
+
+    Args:
+        batch_requests: List of dicts with 'method', 'url' (relative to the Graph
+                        endpoint, e.g. "/me/messages/{id}") and optional 'body'
+
+    Returns:
+        List of dicts with 'status' and 'body', in the same order as batch_requests;
+        requests of a batch that failed as a whole (timeout, 5xx...) get status 0
+    """
+    chunks = [
+        batch_requests[offset : offset + GRAPH_BATCH_SIZE] for offset in range(0, len(batch_requests), GRAPH_BATCH_SIZE)
+    ]
+
+    responses = []
+    for chunk in chunks:
+        try:
+            responses.extend(send_graph_batch(chunk))
+        except Exception as e:
+            # Previous batches are already applied: report the failure per request instead of raising
+            responses.extend({"status": 0, "body": {"error": {"message": str(e)}}} for _ in chunk)
+    return responses
+
+
 # ============================================================================
 # EMAIL FUNCTIONS
 # ============================================================================
 
 
-def list_emails(folder="inbox", limit=10, unread_only=False, search=None):
-    """List emails from specified folder"""
-    params = {"$top": limit}
+def format_email_summary(msg):
+    """Format a Graph message as an email summary"""
+    return {
+        "id": msg["id"],
+        "subject": msg["subject"],
+        "from": msg["from"]["emailAddress"]["address"] if msg.get("from") else "Unknown",
+        "from_name": msg["from"]["emailAddress"]["name"] if msg.get("from") else "Unknown",
+        "received": msg["receivedDateTime"],
+        "is_read": msg["isRead"],
+        # Absent when not requested in $select
+        "has_attachments": msg.get("hasAttachments", False),
+        "preview": msg.get("bodyPreview", ""),
+    }
+
 
-    # $search cannot be combined with $orderby in Microsoft Graph API
-    if not search:
-        params["$orderby"] = "receivedDateTime DESC"
+def format_graph_datetime(value):
+    """Format a datetime (naive = UTC) for Graph $filter expressions"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def iter_emails(folder="inbox", limit=None, unread_only=False, search=None, local=False, since=None, fields=None):
+    """
+    Stream emails from specified folder, page by page
 
+    Args:
+        folder: Mail folder name or ID (default inbox)
+        limit: Maximum number of emails (None for all)
+        unread_only: Only unread emails
+        search: Optional search query
+        local: Read from the local store after an incremental sync (see sync_mailbox)
+        since: Only emails received at or after this datetime (naive = UTC)
+        fields: Graph properties to request ($select), None for all
+
+    Yields:
+        Email summaries (see format_email_summary)
+    """
+    if local:
+        sync_mailbox(folder)
+        yield from iter_stored_emails(folder, limit, unread_only, search, since)
+        return
+
+    params = {"$top": min(limit, GRAPH_PAGE_SIZE) if limit else GRAPH_PAGE_SIZE}
+
+    filters = []
+    if since or (unread_only and not search):
+        # With $orderby, Graph requires the sorted property to be filtered first
+        filters.append(f"receivedDateTime ge {format_graph_datetime(since or datetime(1900, 1, 1))}")
     if unread_only:
-        params["$filter"] = "isRead eq false"
+        filters.append("isRead eq false")
+    if filters:
+        params["$filter"] = " and ".join(filters)
 
+    # $search cannot be combined with $orderby in Microsoft Graph API
     if search:
         params["$search"] = f'"{search}"'
+    else:
+        params["$orderby"] = "receivedDateTime DESC"
 
-    result = make_graph_request("GET", f"/me/mailFolders/{folder}/messages", params=params)
+    if fields:
+        params["$select"] = fields
+
+    messages = iter_graph_items(f"/me/mailFolders/{folder}/messages", params=params)
+    for msg in itertools.islice(messages, limit):
+        yield format_email_summary(msg)
 
-    emails = []
-    for msg in result.get("value", []):
-        emails.append(
-            {
-                "id": msg["id"],
-                "subject": msg["subject"],
-                "from": msg["from"]["emailAddress"]["address"] if msg.get("from") else "Unknown",
-                "from_name": msg["from"]["emailAddress"]["name"] if msg.get("from") else "Unknown",
-                "received": msg["receivedDateTime"],
-                "is_read": msg["isRead"],
-                "has_attachments": msg["hasAttachments"],
-                "preview": msg["bodyPreview"],
-            }
-        )
 
-    return emails
+def list_emails(folder="inbox", limit=10, unread_only=False, search=None, local=False):
+    """List emails from specified folder (limit None for all)"""
+    return list(iter_emails(folder, limit, unread_only, search, local))
 
 
 def read_email(message_id):
     """Read email content"""
-    result = make_graph_request("GET", f"/me/messages/{message_id}")
+    # The attachment list is fetched alongside the message, and only used if it has attachments
+    result, attachments = run_concurrently(
+        [
+            (make_graph_request, ("GET", f"/me/messages/{message_id}")),
+            (make_graph_request, ("GET", f"/me/messages/{message_id}/attachments")),
+        ]
+    )
 
     email_data = {
         "id": result["id"],
@@ -280,53 +694,146 @@ def read_email(message_id):
     }
 
     if result["hasAttachments"]:
-        attachments = make_graph_request("GET", f"/me/messages/{message_id}/attachments")
         email_data["attachments"] = [
-            {"name": att["name"], "content_type": att["contentType"], "size": att["size"]}
+            {"id": att["id"], "name": att["name"], "content_type": att["contentType"], "size": att["size"]}
             for att in attachments.get("value", [])
         ]
 
     return email_data
 
 
+def file_attachment(file_path):
+    """Build a fileAttachment dict with the base64-encoded content of a file"""
+    with open(file_path, "rb") as f:
+        encoded_content = base64.b64encode(f.read()).decode("utf-8")
+
+    return {
+        "@odata.type": "#microsoft.graph.fileAttachment",
+        "name": os.path.basename(file_path),
+        "contentBytes": encoded_content,
+    }
+
+
+def prepare_attachments(file_paths):
+    """
+    Split attachment files between inline attachments and files to upload to a draft
+
+    Smallest files are kept inline first, as long as their total size fits
+    in INLINE_ATTACHMENT_LIMIT; the others are returned to be uploaded
+    (see upload_attachment).
+
+    Returns:
+        (inline attachment dicts, paths of the files to upload)
+    """
+    paths = []
+    for file_path in file_paths or []:
+        file_path = os.path.expanduser(file_path)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Attachment file not found: {file_path}")
+        paths.append(file_path)
+
+    inline_paths = set()
+    inline_size = 0
+    for file_path in sorted(paths, key=os.path.getsize):
+        size = os.path.getsize(file_path)
+        if inline_size + size > INLINE_ATTACHMENT_LIMIT:
+            break
+        inline_paths.add(file_path)
+        inline_size += size
+
+    inline = [file_attachment(file_path) for file_path in paths if file_path in inline_paths]
+    uploads = [file_path for file_path in paths if file_path not in inline_paths]
+    return inline, uploads
+
+
+def upload_attachment(message_id, file_path):
+    """
+    Attach a file to a message
+
+    Files of UPLOAD_SESSION_MIN_SIZE or more go through an upload session,
+    read and sent UPLOAD_CHUNK_SIZE bytes at a time so memory use does not
+    depend on their size; smaller files are posted in one request.
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size < UPLOAD_SESSION_MIN_SIZE:
+        make_graph_request("POST", f"/me/messages/{message_id}/attachments", data=file_attachment(file_path))
+        return
+
+    upload_session = make_graph_request(
+        "POST",
+        f"/me/messages/{message_id}/attachments/createUploadSession",
+        data={"AttachmentItem": {"attachmentType": "file", "name": os.path.basename(file_path), "size": file_size}},
+    )
+    upload_url = upload_session["uploadUrl"]
+
+    with open(file_path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            headers = {
+                "Content-Length": str(len(chunk)),
+                "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{file_size}",
+            }
+
+            for attempt in range(HTTP_MAX_RETRIES + 1):
+                wait_for_throttle()
+                # The upload URL is pre-authenticated: no Authorization header
+                response = get_session().put(upload_url, data=chunk, headers=headers, timeout=HTTP_TIMEOUT)
+                if response.status_code not in THROTTLE_STATUSES or attempt == HTTP_MAX_RETRIES:
+                    break
+                throttle(get_retry_after(response.headers, attempt))
+
+            if not response.ok:
+                print(f"Upload Error: {response.status_code} {response.text}", file=sys.stderr)
+            response.raise_for_status()
+            offset += len(chunk)
+
+
+def upload_attachments(message_id, file_paths):
+    """Upload several attachments to a message in parallel"""
+    run_concurrently([(upload_attachment, (message_id, file_path)) for file_path in file_paths])
+
+
 def send_email(to_addresses, subject, body, cc_addresses=None, body_type="HTML", attachments=None):
-    """Send email with optional attachments"""
+    """
+    Send email with optional attachments
+
+    Small attachments are sent inline with /sendMail. If some are too large,
+    the message is created as a draft, the other files are attached to it
+    (see upload_attachment), then the draft is sent.
+    """
     message = {
-        "message": {
-            "subject": subject,
-            "body": {"contentType": body_type, "content": body},
-            "toRecipients": [{"emailAddress": {"address": addr}} for addr in to_addresses],
-        }
+        "subject": subject,
+        "body": {"contentType": body_type, "content": body},
+        "toRecipients": [{"emailAddress": {"address": addr}} for addr in to_addresses],
     }
 
     if cc_addresses:
-        message["message"]["ccRecipients"] = [{"emailAddress": {"address": addr}} for addr in cc_addresses]
+        message["ccRecipients"] = [{"emailAddress": {"address": addr}} for addr in cc_addresses]
 
     # Add attachments if provided
-    if attachments:
-        message["message"]["attachments"] = []
-        for file_path in attachments:
-            file_path = os.path.expanduser(file_path)
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Attachment file not found: {file_path}")
-
-            # Read file and encode to base64
-            with open(file_path, "rb") as f:
-                file_content = f.read()
-
-            encoded_content = base64.b64encode(file_content).decode("utf-8")
-            file_name = os.path.basename(file_path)
-
-            message["message"]["attachments"].append(
-                {"@odata.type": "#microsoft.graph.fileAttachment", "name": file_name, "contentBytes": encoded_content}
-            )
+    inline, uploads = prepare_attachments(attachments)
+    if inline:
+        message["attachments"] = inline
+
+    if not uploads:
+        make_graph_request("POST", "/me/sendMail", data={"message": message})
+        return True
 
-    make_graph_request("POST", "/me/sendMail", data=message)
+    draft = make_graph_request("POST", "/me/messages", data=message)
+    try:
+        upload_attachments(draft["id"], uploads)
+    except Exception:
+        # Do not leave a half-built draft behind
+        delete_email(draft["id"])
+        raise
+
+    make_graph_request("POST", f"/me/messages/{draft['id']}/send")
     return True
 
 
 def create_draft(to_addresses, subject, body, cc_addresses=None, body_type="HTML", attachments=None):
-    """Create draft email without sending, with optional attachments"""
+    """Create draft email without sending, with optional attachments (large ones uploaded to the draft)"""
     message = {
         "subject": subject,
         "body": {"contentType": body_type, "content": body},
@@ -337,25 +844,18 @@ def create_draft(to_addresses, subject, body, cc_addresses=None, body_type="HTML
         message["ccRecipients"] = [{"emailAddress": {"address": addr}} for addr in cc_addresses]
 
     # Add attachments if provided
-    if attachments:
-        message["attachments"] = []
-        for file_path in attachments:
-            file_path = os.path.expanduser(file_path)
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Attachment file not found: {file_path}")
-
-            # Read file and encode to base64
-            with open(file_path, "rb") as f:
-                file_content = f.read()
-
-            encoded_content = base64.b64encode(file_content).decode("utf-8")
-            file_name = os.path.basename(file_path)
-
-            message["attachments"].append(
-                {"@odata.type": "#microsoft.graph.fileAttachment", "name": file_name, "contentBytes": encoded_content}
-            )
+    inline, uploads = prepare_attachments(attachments)
+    if inline:
+        message["attachments"] = inline
 
     result = make_graph_request("POST", "/me/messages", data=message)
+    try:
+        upload_attachments(result["id"], uploads)
+    except Exception:
+        # Do not leave a half-built draft behind
+        delete_email(result["id"])
+        raise
+
     return result
 
 
@@ -383,28 +883,89 @@ def delete_email(message_id):
 
 def get_mail_folders():
     """Get list of mail folders"""
-    result = make_graph_request("GET", "/me/mailFolders")
     folders = {}
-    for folder in result.get("value", []):
+    for folder in iter_graph_items("/me/mailFolders", params={"$top": GRAPH_PAGE_SIZE}):
         folders[folder["displayName"].lower()] = folder["id"]
     return folders
 
 
-def move_email(message_id, folder_name):
-    """Move email to specified folder"""
-    # Get folder ID
+def load_folder_cache():
+    """Load the mail folder name -> ID cache (None if missing, unreadable or expired)"""
+    if not FOLDER_CACHE_FILE.exists():
+        return None
+
+    try:
+        with open(FOLDER_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - cache.get("updated", 0) > FOLDER_CACHE_TTL:
+        return None
+    return cache.get("folders")
+
+
+def refresh_folder_cache():
+    """Fetch mail folders from Graph and save them to the folder cache"""
+    global _folder_cache
+
     folders = get_mail_folders()
+
+    FOLDER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = FOLDER_CACHE_FILE.with_suffix(".tmp")
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"updated": time.time(), "folders": folders}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, FOLDER_CACHE_FILE)
+
+    _folder_cache = folders
+    return folders
+
+
+def get_folder_id(folder_name, refresh=False):
+    """
+    Get mail folder ID from its display name (case-insensitive)
+
+    IDs come from a cache shared across invocations; it is refreshed from
+    Graph when older than FOLDER_CACHE_TTL, when the name is unknown, or
+    when refresh is set.
+    """
+    global _folder_cache
+
     folder_name_lower = folder_name.lower()
 
+    # Parallel moves wait for a single refresh instead of each fetching the folders
+    with _folder_lock:
+        if _folder_cache is None and not refresh:
+            _folder_cache = load_folder_cache()
+
+        folders = _folder_cache
+        if refresh or folders is None or folder_name_lower not in folders:
+            folders = refresh_folder_cache()
+
     if folder_name_lower not in folders:
         raise ValueError(f"Folder '{folder_name}' not found. Available folders: {', '.join(folders.keys())}")
 
-    folder_id = folders[folder_name_lower]
+    return folders[folder_name_lower]
+
+
+def move_email(message_id, folder_name):
+    """Move email to specified folder"""
+    folder_id = get_folder_id(folder_name)
 
     # Move email
     move_data = {"destinationId": folder_id}
 
-    make_graph_request("POST", f"/me/messages/{message_id}/move", data=move_data)
+    try:
+        make_graph_request("POST", f"/me/messages/{message_id}/move", data=move_data)
+    except requests.exceptions.HTTPError as e:
+        # The cached folder may have been deleted or recreated: retry once with a fresh ID
+        if e.response is None or e.response.status_code not in (400, 404):
+            raise
+        fresh_id = get_folder_id(folder_name, refresh=True)
+        if fresh_id == folder_id:
+            raise
+        make_graph_request("POST", f"/me/messages/{message_id}/move", data={"destinationId": fresh_id})
     return True
 
 
@@ -413,9 +974,14 @@ def archive_email(message_id):
     return move_email(message_id, "archive")
 
 
-def search_emails(query, limit=20):
+def iter_search_emails(query, limit=20, local=False):
+    """Stream emails matching a search query"""
+    return iter_emails(limit=limit, search=query, local=local)
+
+
+def search_emails(query, limit=20, local=False):
     """Search emails"""
-    return list_emails(limit=limit, search=query)
+    return list(iter_search_emails(query, limit, local))
 
 
 def mark_important(message_id):
@@ -425,79 +991,137 @@ def mark_important(message_id):
     return True
 
 
+def get_email_rules_path():
+    """Get path to the email filtering rules file"""
+    return os.path.join(os.path.dirname(__file__), "email_rules.json")
+
+
 def load_email_rules():
     """Load email filtering rules from JSON file"""
-    import os
-
-    rules_file = os.path.join(os.path.dirname(__file__), "email_rules.json")
+    rules_file = get_email_rules_path()
     if os.path.exists(rules_file):
         with open(rules_file, "r") as f:
             return json.load(f)
     return {}
 
 
+def compile_pattern(substrings):
+    """Compile substrings into one regex matching any of them (None if empty)"""
+    if not substrings:
+        return None
+    # Longest first, so the reported match is the most specific one
+    alternatives = sorted((re.escape(item) for item in substrings), key=len, reverse=True)
+    return re.compile("|".join(alternatives))
+
+
+def compile_email_rules(rules):
+    """
+    Compile email rules for fast matching
+
+    Exact sender lists become sets, substring lists become a single combined
+    regex and subject prefixes a tuple for str.startswith, so each message is
+    checked in one pass per rule instead of one scan per list entry.
+    """
+
+    def lower(key):
+        return [item.lower() for item in rules.get(key, [])]
+
+    return {
+        "vip_senders": set(lower("vip_senders")),
+        "auto_archive_domains": compile_pattern(lower("auto_archive_domains")),
+        "auto_archive_keywords": compile_pattern(lower("auto_archive_keywords")),
+        "partner_whitelist": compile_pattern(lower("partner_whitelist")),
+        "auto_archive_subjects": tuple(lower("auto_archive_subjects")),
+        "system_emails": set(lower("system_emails")),
+    }
+
+
+# Compiled rules and the mtime of the rules file they were built from
+_compiled_rules = {"mtime": None, "rules": None}
+
+
+def get_compiled_rules():
+    """Get compiled email rules, recompiling them when email_rules.json changes"""
+    rules_file = get_email_rules_path()
+    mtime = os.stat(rules_file).st_mtime_ns if os.path.exists(rules_file) else None
+
+    if _compiled_rules["rules"] is None or _compiled_rules["mtime"] != mtime:
+        _compiled_rules.update(mtime=mtime, rules=compile_email_rules(load_email_rules()))
+
+    return _compiled_rules["rules"]
+
+
 def check_email_rules(email):
     """
     Check email against rules and return action to take
     Returns: dict with 'action', 'reason', 'priority'
     """
-    rules = load_email_rules()
+    rules = get_compiled_rules()
     sender = email.get("from", "").lower()
     subject = email.get("subject", "").lower()
 
     # Rule 1: VIP Senders - Mark as important
-    vip_senders = [s.lower() for s in rules.get("vip_senders", [])]
-    if sender in vip_senders:
+    if sender in rules["vip_senders"]:
         return {"action": "mark_important", "reason": f'VIP sender: {email.get("from_name", sender)}', "priority": 1}
 
+    partner = rules["partner_whitelist"].search(sender) if rules["partner_whitelist"] else None
+
     # Rule 2: Auto-archive - Recruitment emails from external
     if not sender.endswith("@loreal.com"):
         # Check auto-archive domains
-        for domain in rules.get("auto_archive_domains", []):
-            if domain in sender:
-                return {"action": "archive", "reason": f"Recruitment/spam from {domain}", "priority": 5}
-
-        # Check auto-archive keywords in subject
-        for keyword in rules.get("auto_archive_keywords", []):
-            if keyword in subject:
-                # Verify it's not from a whitelisted partner
-                is_whitelisted = any(partner in sender for partner in rules.get("partner_whitelist", []))
-                if not is_whitelisted:
-                    return {"action": "archive", "reason": f'External recruitment email: "{keyword}"', "priority": 5}
+        domain = rules["auto_archive_domains"].search(sender) if rules["auto_archive_domains"] else None
+        if domain:
+            return {"action": "archive", "reason": f"Recruitment/spam from {domain.group()}", "priority": 5}
+
+        # Check auto-archive keywords in subject, unless from a whitelisted partner
+        keyword = rules["auto_archive_keywords"].search(subject) if rules["auto_archive_keywords"] else None
+        if keyword and not partner:
+            return {"action": "archive", "reason": f'External recruitment email: "{keyword.group()}"', "priority": 5}
 
     # Rule 3: Auto-archive declined/cancelled meetings
-    for pattern in rules.get("auto_archive_subjects", []):
-        if subject.startswith(pattern):
-            return {"action": "archive", "reason": f"Cancelled/declined meeting", "priority": 4}
+    if rules["auto_archive_subjects"] and subject.startswith(rules["auto_archive_subjects"]):
+        return {"action": "archive", "reason": f"Cancelled/declined meeting", "priority": 4}
 
     # Rule 4: System emails requiring action
-    if sender in rules.get("system_emails", []):
+    if sender in rules["system_emails"]:
         if "approu" in subject or "approve" in subject:
             return {"action": "flag", "reason": "Action required: Approval needed", "priority": 2}
 
     # Rule 5: Partner whitelist - keep but don't prioritize
-    for partner in rules.get("partner_whitelist", []):
-        if partner in sender:
-            return {"action": "keep", "reason": f"Whitelisted partner: {partner}", "priority": 3}
+    if partner:
+        return {"action": "keep", "reason": f"Whitelisted partner: {partner.group()}", "priority": 3}
 
     # Default: keep
     return {"action": "keep", "reason": "No matching rule", "priority": 3}
 
 
-def process_inbox(limit=100, dry_run=False):
+# Message properties process_inbox needs: rule inputs (sender, subject) and the summary
+INBOX_RULE_FIELDS = "id,subject,from,receivedDateTime,isRead"
+
+
+def process_inbox(limit=100, dry_run=False, local=False, since_days=None):
     """
-    Process inbox and apply filtering rules
+    Process unread inbox emails and apply filtering rules (limit None for the whole inbox)
+    Only unread emails (received in the last since_days days, if set) are fetched,
+    with just the fields the rules need.
+    With local=True, messages are read from the local store after an incremental sync
     Returns summary of actions taken
     """
-    emails = list_emails(folder="inbox", limit=limit, unread_only=False)
+    since = datetime.now(timezone.utc) - timedelta(days=since_days) if since_days else None
 
-    actions_taken = {"mark_important": [], "archive": [], "flag": [], "keep": []}
+    # Emails are streamed; changes are only applied once every page has been read,
+    # since moving messages out of the inbox would shift the pages still to come
+    emails = iter_emails(
+        folder="inbox", limit=limit, unread_only=True, local=local, since=since, fields=INBOX_RULE_FIELDS
+    )
 
-    for email in emails:
-        # Skip if already read and not important
-        if email.get("is_read") and not dry_run:
-            continue
+    actions_taken = {"mark_important": [], "archive": [], "flag": [], "keep": [], "failed": []}
 
+    # Changes are collected and sent together through $batch
+    pending = []
+    archive_folder_id = None
+
+    for email in emails:
         rule_result = check_email_rules(email)
         action = rule_result["action"]
 
@@ -510,25 +1134,48 @@ def process_inbox(limit=100, dry_run=False):
             "priority": rule_result["priority"],
         }
 
-        if dry_run:
+        if dry_run or action in ("flag", "keep"):
+            # Flag: just keep track, don't move
             actions_taken[action].append(email_info)
-        else:
-            # Execute action
-            if action == "mark_important":
-                mark_important(email["id"])
-                mark_email(email["id"], True)  # Also mark as read
-                actions_taken[action].append(email_info)
-
-            elif action == "archive":
-                archive_email(email["id"])
-                actions_taken[action].append(email_info)
 
-            elif action == "flag":
-                # Just keep track, don't move
-                actions_taken[action].append(email_info)
-
-            else:  # keep
-                actions_taken[action].append(email_info)
+        elif action == "mark_important":
+            # Mark as important and read in a single update
+            request = {
+                "method": "PATCH",
+                "url": f"/me/messages/{email['id']}",
+                "body": {"importance": "high", "categories": ["Important", "VIP"], "isRead": True},
+            }
+            pending.append((action, email_info, request))
+
+        elif action == "archive":
+            if archive_folder_id is None:
+                archive_folder_id = get_folder_id("archive")
+            request = {
+                "method": "POST",
+                "url": f"/me/messages/{email['id']}/move",
+                "body": {"destinationId": archive_folder_id},
+            }
+            pending.append((action, email_info, request))
+
+    responses = make_graph_batch([request for _, _, request in pending])
+
+    # The cached Archive folder may have been deleted or recreated: retry rejected moves once with a fresh ID
+    stale = [
+        i for i, (action, _, _) in enumerate(pending) if action == "archive" and responses[i]["status"] in (400, 404)
+    ]
+    if stale:
+        fresh_id = get_folder_id("archive", refresh=True)
+        if fresh_id != archive_folder_id:
+            retried = [{**pending[i][2], "body": {"destinationId": fresh_id}} for i in stale]
+            for i, response in zip(stale, make_graph_batch(retried)):
+                responses[i] = response
+
+    for (action, email_info, _), response in zip(pending, responses):
+        if 200 <= response["status"] < 300:
+            actions_taken[action].append(email_info)
+        else:
+            error = response["body"].get("error", {}).get("message", f"HTTP {response['status']}")
+            actions_taken["failed"].append({**email_info, "action": action, "error": error})
 
     # Sort by priority
     for action in actions_taken:
@@ -538,204 +1185,564 @@ def process_inbox(limit=100, dry_run=False):
 
 
 # ============================================================================
-# CALENDAR FUNCTIONS
+# LOCAL STORE
 # ============================================================================
 
+MESSAGE_DELTA_FIELDS = "id,subject,from,receivedDateTime,isRead,hasAttachments,bodyPreview"
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    sender TEXT,
+    sender_name TEXT,
+    subject TEXT,
+    received TEXT,
+    is_read INTEGER,
+    has_attachments INTEGER,
+    preview TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_folder_received ON messages (folder, received);
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_start ON events (start);
+CREATE TABLE IF NOT EXISTS delta_links (
+    collection TEXT PRIMARY KEY,
+    delta_link TEXT NOT NULL
+);
+"""
+
+
+def open_store():
+    """Open the local SQLite store, creating its schema if needed"""
+    STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(STORE_FILE)
+    os.chmod(STORE_FILE, 0o600)
+
+    conn.executescript(STORE_SCHEMA)
+    return conn
+
+
+def iter_delta_items(conn, collection, endpoint, params=None, reset=False, on_full_sync=None):
+    """
+    Iterate over the changes of a Graph collection since its last delta sync
+
+    The delta link saved for `collection` is resumed if there is one; otherwise
+    (first sync, reset, or expired delta token) `endpoint` is fetched from
+    scratch after calling on_full_sync(), which must drop the local copy. The
+    new delta link is saved once every page has been consumed.
+
+    Yields:
+        Changed items; deleted ones carry an '@removed' key
+    """
+    row = conn.execute("SELECT delta_link FROM delta_links WHERE collection = ?", (collection,)).fetchone()
+    delta_link = None if reset or not row else row[0]
+
+    if delta_link:
+        try:
+            result = make_graph_request("GET", delta_link)
+        except requests.exceptions.HTTPError as e:
+            # 410 Gone: the delta token expired, start over
+            if e.response is None or e.response.status_code != 410:
+                raise
+            delta_link = None
+
+    if not delta_link:
+        if on_full_sync:
+            on_full_sync()
+        result = make_graph_request("GET", endpoint, params=params)
+
+    while True:
+        yield from result.get("value", [])
+
+        if "@odata.nextLink" in result:
+            result = make_graph_request("GET", result["@odata.nextLink"])
+            continue
+
+        # Last page: remember where to resume next time
+        conn.execute("INSERT OR REPLACE INTO delta_links VALUES (?, ?)", (collection, result["@odata.deltaLink"]))
+        return
+
+
+def sync_mailbox(folder="inbox", reset=False):
+    """
+    Sync message metadata of a mail folder into the local store
+
+    The first sync downloads every message of the folder; later syncs only
+    fetch what changed since the previous one, using the persisted delta link
+    of Graph's messages/delta endpoint.
+
+    Args:
+        folder: Mail folder name or ID (default inbox)
+        reset: Drop the stored messages and delta link and sync from scratch
+
+    Returns:
+        dict with 'updated', 'removed' and 'total' counts
+    """
+    stats = {"updated": 0, "removed": 0, "total": 0}
+
+    with open_store() as conn:
+        changes = iter_delta_items(
+            conn,
+            f"messages:{folder}",
+            f"/me/mailFolders/{folder}/messages/delta",
+            params={"$select": MESSAGE_DELTA_FIELDS},
+            reset=reset,
+            on_full_sync=lambda: conn.execute("DELETE FROM messages WHERE folder = ?", (folder,)),
+        )
+
+        for msg in changes:
+            if "@removed" in msg:
+                conn.execute("DELETE FROM messages WHERE id = ?", (msg["id"],))
+                stats["removed"] += 1
+                continue
+
+            email = format_email_summary(msg)
+            conn.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    email["id"],
+                    folder,
+                    email["from"],
+                    email["from_name"],
+                    email["subject"],
+                    email["received"],
+                    email["is_read"],
+                    email["has_attachments"],
+                    email["preview"],
+                ),
+            )
+            stats["updated"] += 1
+
+        stats["total"] = conn.execute("SELECT COUNT(*) FROM messages WHERE folder = ?", (folder,)).fetchone()[0]
 
-def get_local_timezone_offset():
+    conn.close()
+    return stats
+
+
+def iter_stored_emails(folder="inbox", limit=None, unread_only=False, search=None, since=None):
     """
-    Get local timezone offset in hours from UTC
-    Returns: (offset_hours, timezone_name)
+    Stream emails from the local store, most recent first
+
+    Args:
+        folder: Mail folder name or ID, as passed to sync_mailbox
+        limit: Maximum number of emails (None for all)
+        unread_only: Only unread emails
+        search: Optional text matched (case-insensitive) against sender, subject and preview
+        since: Only emails received at or after this datetime (naive = UTC)
+
+    Yields:
+        Email summaries (same fields as format_email_summary)
     """
+    query = "SELECT id, subject, sender, sender_name, received, is_read, has_attachments, preview FROM messages"
+    query += " WHERE folder = ?"
+    params = [folder]
+
+    if unread_only:
+        query += " AND is_read = 0"
+
+    if since:
+        # Graph timestamps are UTC ISO 8601 strings, which sort chronologically
+        query += " AND received >= ?"
+        params.append(format_graph_datetime(since))
+
+    if search:
+        query += " AND (sender LIKE ? OR sender_name LIKE ? OR subject LIKE ? OR preview LIKE ?)"
+        params.extend([f"%{search}%"] * 4)
+
+    query += " ORDER BY received DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    conn = open_store()
     try:
-        # Get timezone offset using date command
-        result = subprocess.run(["date", "+%z"], capture_output=True, text=True, check=True)
-        offset_str = result.stdout.strip()  # e.g., "+0100" for CET
+        for row in conn.execute(query, params):
+            yield {
+                "id": row[0],
+                "subject": row[1],
+                "from": row[2],
+                "from_name": row[3],
+                "received": row[4],
+                "is_read": bool(row[5]),
+                "has_attachments": bool(row[6]),
+                "preview": row[7],
+            }
+    finally:
+        conn.close()
 
-        # Parse offset: +0100 means +1 hour
-        sign = 1 if offset_str[0] == "+" else -1
-        hours = int(offset_str[1:3])
-        minutes = int(offset_str[3:5])
-        offset_hours = sign * (hours + minutes / 60)
 
-        # Get timezone name
-        result = subprocess.run(["date", "+%Z"], capture_output=True, text=True, check=True)
-        tz_name = result.stdout.strip()
+# Months of calendar kept in the local store, starting with the previous month
+EVENT_SYNC_MONTHS = 4
 
-        return offset_hours, tz_name
-    except Exception as e:
-        # Default to UTC if detection fails
-        print(f"Warning: Could not detect timezone, using UTC: {e}", file=sys.stderr)
-        return 0, "UTC"
+
+def get_calendar_sync_window(today=None):
+    """
+    Get the (start, end) UTC datetimes of the calendar window kept in the local store
+
+    The window is aligned on months so its delta link stays valid for a whole
+    month (a calendarView delta link is bound to its window).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    month_index = start.month - 1 + EVENT_SYNC_MONTHS
+    end = date(start.year + month_index // 12, month_index % 12 + 1, 1)
+    return datetime(start.year, start.month, start.day), datetime(end.year, end.month, end.day)
 
 
-def convert_utc_to_local(utc_time_str):
+def sync_calendar(reset=False):
     """
-    Convert UTC time string to local time
+    Sync calendar events of the store window into the local store
+
+    Uses Graph's calendarView/delta endpoint: the first sync of a window
+    downloads all its events, later ones only the events that changed. The
+    attachment names of changed events with attachments are fetched as well.
+
     Args:
-        utc_time_str: ISO 8601 time string like "2025-11-26T07:30:00.0000000"
+        reset: Drop the stored events and delta link and sync from scratch
+
     Returns:
-        Local time string in same format
+        dict with 'updated', 'removed' and 'total' counts
+    """
+    window_start, window_end = get_calendar_sync_window()
+    stats = {"updated": 0, "removed": 0, "total": 0}
+
+    def drop_events():
+        # Events and delta links of previous windows are obsolete
+        conn.execute("DELETE FROM events")
+        conn.execute("DELETE FROM delta_links WHERE collection LIKE 'events:%'")
+
+    with open_store() as conn:
+        changes = iter_delta_items(
+            conn,
+            f"events:{window_start.date()}:{window_end.date()}",
+            "/me/calendarView/delta",
+            params={
+                "startDateTime": format_graph_datetime(window_start),
+                "endDateTime": format_graph_datetime(window_end),
+            },
+            reset=reset,
+            on_full_sync=drop_events,
+        )
+
+        changed = []
+        for evt in changes:
+            if "@removed" in evt:
+                conn.execute("DELETE FROM events WHERE id = ?", (evt["id"],))
+                stats["removed"] += 1
+            else:
+                changed.append(evt)
+
+        # Delta results do not include attachments: fetch their names for changed events only
+        with_attachments = [evt for evt in changed if evt.get("hasAttachments")]
+        attachment_lists = run_concurrently(
+            [
+                (make_graph_request, ("GET", f"/me/events/{evt['id']}/attachments", None, {"$select": "name"}))
+                for evt in with_attachments
+            ]
+        )
+        for evt, attachments in zip(with_attachments, attachment_lists):
+            evt["attachments"] = attachments.get("value", [])
+
+        for evt in changed:
+            # Times are stored as "YYYY-MM-DDTHH:MM:SS" (no fractional seconds), the format of the query bounds
+            conn.execute(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)",
+                (
+                    evt["id"],
+                    evt["start"]["dateTime"][:19],
+                    evt["end"]["dateTime"][:19],
+                    json.dumps(evt, ensure_ascii=False),
+                ),
+            )
+            stats["updated"] += 1
+
+        stats["total"] = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    conn.close()
+    return stats
+
+
+def iter_stored_events(start_time, end_time, descending=False):
+    """
+    Stream raw Graph events overlapping [start_time, end_time) from the local store
+
+    Args:
+        start_time: Window start (naive UTC datetime)
+        end_time: Window end (naive UTC datetime)
+        descending: Latest events first
+
+    Yields:
+        Raw Graph events (dicts), by start time
     """
+    order = "DESC" if descending else "ASC"
+    conn = open_store()
     try:
-        # Parse UTC time
-        utc_dt = datetime.fromisoformat(utc_time_str.replace("Z", "").split(".")[0])
+        # Stored times are UTC "YYYY-MM-DDTHH:MM:SS" strings, which sort chronologically
+        rows = conn.execute(
+            f"SELECT data FROM events WHERE start < ? AND end > ? ORDER BY start {order}",
+            (end_time.strftime("%Y-%m-%dT%H:%M:%S"), start_time.strftime("%Y-%m-%dT%H:%M:%S")),
+        )
+        for row in rows:
+            yield json.loads(row[0])
+    finally:
+        conn.close()
 
-        # Get local offset
-        offset_hours, _ = get_local_timezone_offset()
 
-        # Convert to local time
-        local_dt = utc_dt + timedelta(hours=offset_hours)
+def get_stored_event(event_id):
+    """Get a raw Graph event from the local store (None if not stored)"""
+    conn = open_store()
+    try:
+        row = conn.execute("SELECT data FROM events WHERE id = ?", (event_id,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+
+# ============================================================================
+# CALENDAR FUNCTIONS
+# ============================================================================
+
+
+# Format of event times in summaries (Graph's dateTime format)
+EVENT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.0000000"
+
+
+@lru_cache(maxsize=None)
+def get_local_timezone():
+    """
+    Get the local time zone
+
+    Uses the IANA zone from $TZ or /etc/localtime so conversions follow DST
+    changes; falls back to the current fixed UTC offset. Looked up once per process.
+    """
+    name = os.environ.get("TZ", "").lstrip(":")
+    if not name and os.path.islink("/etc/localtime"):
+        # e.g. /usr/share/zoneinfo/Europe/Paris
+        name = os.path.realpath("/etc/localtime").partition("zoneinfo/")[2]
+
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+
+    return datetime.now().astimezone().tzinfo
 
-        # Return in same format
-        return local_dt.strftime("%Y-%m-%dT%H:%M:%S.0000000")
-    except Exception as e:
-        print(f"Warning: Could not convert time {utc_time_str}: {e}", file=sys.stderr)
-        return utc_time_str
+
+@lru_cache(maxsize=None)
+def get_timezone(name):
+    """Get the tzinfo of an IANA time zone name, as used in Graph dateTimeTimeZone values (UTC if unknown)"""
+    if name == "UTC":
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"Warning: Unknown time zone {name}, using UTC", file=sys.stderr)
+        return timezone.utc
+
+
+def parse_event_time(time_str):
+    """Parse a Graph/event ISO 8601 time string into a naive datetime (fractional seconds and zone ignored)"""
+    # Graph uses 7 fractional digits, which fromisoformat rejects: keep "YYYY-MM-DDTHH:MM:SS"
+    return datetime.fromisoformat(time_str[:19])
+
+
+def parse_graph_datetime(value):
+    """
+    Parse a Graph dateTimeTimeZone value into an aware datetime
+
+    Args:
+        value: dict like {"dateTime": "2025-11-26T07:30:00.0000000", "timeZone": "UTC"}
+    """
+    return parse_event_time(value["dateTime"]).replace(tzinfo=get_timezone(value.get("timeZone", "UTC")))
 
 
 def detect_meeting_collisions(events):
     """
     Detect overlapping meetings in a list of events
 
+    Events are sorted by start time and swept once, keeping the meetings still
+    in progress; overlapping meetings are merged into groups with a union-find,
+    so chains of overlaps (A-B, B-C) end up in one group.
+
     Args:
         events: List of event dictionaries with 'start', 'end', 'id', 'my_response' fields
 
     Returns:
-        List of collision groups, each containing event_ids that overlap
+        List of collision groups, each with the overlapping 'event_ids' (by start time)
+        and the 'overlaps' between pairs of them ('event_ids', 'minutes')
     """
-    collisions = []
-
     # Only check for collisions among accepted/tentative meetings (not declined)
-    active_events = [e for e in events if e.get("my_response") not in ["declined", "none"]]
-
-    for i, event1 in enumerate(active_events):
-        for event2 in active_events[i + 1 :]:
-            # Parse timestamps
-            try:
-                start1 = datetime.fromisoformat(event1["start"].replace("Z", "").split(".")[0])
-                end1 = datetime.fromisoformat(event1["end"].replace("Z", "").split(".")[0])
-                start2 = datetime.fromisoformat(event2["start"].replace("Z", "").split(".")[0])
-                end2 = datetime.fromisoformat(event2["end"].replace("Z", "").split(".")[0])
-
-                # Check for overlap: events overlap if one starts before the other ends
-                if start1 < end2 and start2 < end1:
-                    # Found collision - check if already in a collision group
-                    found_group = False
-                    for collision in collisions:
-                        if event1["id"] in collision["event_ids"] or event2["id"] in collision["event_ids"]:
-                            collision["event_ids"].add(event1["id"])
-                            collision["event_ids"].add(event2["id"])
-                            found_group = True
-                            break
-
-                    if not found_group:
-                        collisions.append({"event_ids": {event1["id"], event2["id"]}})
-
-            except Exception as e:
-                print(f"Warning: Could not parse times for collision detection: {e}", file=sys.stderr)
-                continue
+    intervals = []
+    for event in events:
+        if event.get("my_response") in ["declined", "none"]:
+            continue
+        try:
+            intervals.append((parse_event_time(event["start"]), parse_event_time(event["end"]), event["id"]))
+        except Exception as e:
+            print(f"Warning: Could not parse times for collision detection: {e}", file=sys.stderr)
 
-    # Convert sets to lists for JSON serialization
-    for collision in collisions:
-        collision["event_ids"] = list(collision["event_ids"])
+    intervals.sort()
+
+    parent = {}
+
+    def find(event_id):
+        while parent[event_id] != event_id:
+            parent[event_id] = parent[parent[event_id]]
+            event_id = parent[event_id]
+        return event_id
+
+    overlaps = []
+    in_progress = []  # heap of (end, start, id)
+    for start, end, event_id in intervals:
+        parent[event_id] = event_id
+
+        # Meetings that ended before this one starts cannot overlap it (nor anything later)
+        while in_progress and in_progress[0][0] <= start:
+            heapq.heappop(in_progress)
 
-    return collisions
+        for other_end, other_start, other_id in in_progress:
+            parent[find(event_id)] = find(other_id)
+            minutes = (min(end, other_end) - start).total_seconds() / 60
+            overlaps.append({"event_ids": [other_id, event_id], "minutes": round(minutes)})
 
+        heapq.heappush(in_progress, (end, start, event_id))
 
-def list_events(days_ahead=7, days_back=0, limit=50, include_canceled=False, filter_subject=None):
+    groups = {}
+    for start, end, event_id in intervals:
+        root = find(event_id)
+        groups.setdefault(root, {"event_ids": [], "overlaps": []})["event_ids"].append(event_id)
+    for overlap in overlaps:
+        groups[find(overlap["event_ids"][0])]["overlaps"].append(overlap)
+
+    # Groups are listed by their first meeting
+    return [group for group in groups.values() if len(group["event_ids"]) > 1]
+
+
+def format_event_summary(evt):
+    """Format a Graph event as an event summary, with times converted to local time"""
+    is_cancelled = evt.get("isCancelled", False)
+    my_response = evt.get("responseStatus", {}).get("response", "none")
+
+    # Get attendees (first 6)
+    attendees_list = evt.get("attendees", [])
+    attendees_display = []
+    for i, att in enumerate(attendees_list[:6]):
+        attendees_display.append(
+            {
+                "name": att["emailAddress"].get("name", att["emailAddress"]["address"]),
+                "email": att["emailAddress"]["address"],
+            }
+        )
+
+    has_more_attendees = len(attendees_list) > 6
+    remaining_count = len(attendees_list) - 6 if has_more_attendees else 0
+
+    # Get attachments (just names)
+    attachments_list = evt.get("attachments", [])
+    attachment_names = [att.get("name", "Unnamed") for att in attachments_list]
+
+    # Convert times to the local time zone (DST-aware)
+    local_tz = get_local_timezone()
+    start_local = parse_graph_datetime(evt["start"]).astimezone(local_tz)
+    end_local = parse_graph_datetime(evt["end"]).astimezone(local_tz)
+
+    return {
+        "id": evt["id"],
+        "subject": evt["subject"],
+        "start": start_local.strftime(EVENT_TIME_FORMAT),
+        "end": end_local.strftime(EVENT_TIME_FORMAT),
+        "timezone": start_local.tzname(),
+        "location": (evt.get("location") or {}).get("displayName", ""),
+        "organizer": evt["organizer"]["emailAddress"]["address"] if evt.get("organizer") else "Unknown",
+        "organizer_name": evt["organizer"]["emailAddress"].get("name", "") if evt.get("organizer") else "Unknown",
+        "is_online_meeting": evt.get("isOnlineMeeting", False),
+        "online_meeting_url": (evt.get("onlineMeeting") or {}).get("joinUrl", ""),
+        "attendees": attendees_display,
+        "more_attendees": remaining_count,
+        "my_response": my_response,
+        "is_cancelled": is_cancelled,
+        "has_attachments": evt.get("hasAttachments", False),
+        "attachments": attachment_names,
+    }
+
+
+def iter_events(days_ahead=7, days_back=0, limit=50, include_canceled=False, local=False):
     """
-    List calendar events
+    Stream calendar events, page by page
 
     Args:
         days_ahead: Number of days in the future to retrieve (default 7)
         days_back: Number of days in the past to retrieve (default 0)
-        limit: Maximum number of events to return (default 50)
+        limit: Maximum number of events to yield, after canceled/declined filtering (None for all)
         include_canceled: Include canceled/declined events (default False)
-        filter_subject: Optional regex pattern to filter events by subject (default None)
+        local: Read from the local store after an incremental sync (see sync_calendar)
+
+    Yields:
+        Event summaries with times converted to local time
     """
     if days_back > 0:
         # Query past events only
-        start_time = (datetime.utcnow() - timedelta(days=days_back)).isoformat() + "Z"
-        end_time = datetime.utcnow().isoformat() + "Z"
+        end = datetime.utcnow()
+        start = end - timedelta(days=days_back)
     else:
         # Query from start of today (00:00) to end of days_ahead
         # This ensures we see all events for today, including past ones
         now = datetime.utcnow()
-        start_of_today = datetime(now.year, now.month, now.day, 0, 0, 0)
-        start_time = start_of_today.isoformat() + "Z"
-        end_time = (start_of_today + timedelta(days=days_ahead)).isoformat() + "Z"
-
-    # Use calendarView instead of calendar/events to get events across all calendars
-    params = {
-        "startDateTime": start_time,
-        "endDateTime": end_time,
-        "$top": limit,
-        "$orderby": "start/dateTime DESC" if days_back > 0 else "start/dateTime",
-        "$select": "id,subject,start,end,location,organizer,isOnlineMeeting,onlineMeeting,attendees,responseStatus,isCancelled,hasAttachments,attachments",
-    }
+        start = datetime(now.year, now.month, now.day, 0, 0, 0)
+        end = start + timedelta(days=days_ahead)
 
-    result = make_graph_request("GET", "/me/calendarView", params=params)
+    window_start, window_end = get_calendar_sync_window()
+    if local and window_start <= start and end <= window_end:
+        sync_calendar()
+        raw_events = iter_stored_events(start, end, descending=days_back > 0)
+    else:
+        if local:
+            print("Warning: requested period is outside the local calendar store, querying Graph", file=sys.stderr)
+
+        # Use calendarView instead of calendar/events to get events across all calendars
+        params = {
+            "startDateTime": start.isoformat() + "Z",
+            "endDateTime": end.isoformat() + "Z",
+            "$top": min(limit, GRAPH_PAGE_SIZE) if limit else GRAPH_PAGE_SIZE,
+            "$orderby": "start/dateTime DESC" if days_back > 0 else "start/dateTime",
+            "$select": "id,subject,start,end,location,organizer,isOnlineMeeting,onlineMeeting,attendees,responseStatus,isCancelled,hasAttachments,attachments",
+        }
+        raw_events = iter_graph_items("/me/calendarView", params=params)
 
-    events = []
-    if result and "value" in result:
-        for evt in result.get("value", []):
-            # Filter out canceled/declined events unless include_canceled is True
-            is_cancelled = evt.get("isCancelled", False)
-            my_response = evt.get("responseStatus", {}).get("response", "none")
+    count = 0
+    for evt in raw_events:
+        # Filter out canceled/declined events unless include_canceled is True
+        is_cancelled = evt.get("isCancelled", False)
+        my_response = evt.get("responseStatus", {}).get("response", "none")
 
-            if not include_canceled and (is_cancelled or my_response == "declined"):
-                continue
+        if not include_canceled and (is_cancelled or my_response == "declined"):
+            continue
 
-            # Get attendees (first 6)
-            attendees_list = evt.get("attendees", [])
-            attendees_display = []
-            for i, att in enumerate(attendees_list[:6]):
-                attendees_display.append(
-                    {
-                        "name": att["emailAddress"].get("name", att["emailAddress"]["address"]),
-                        "email": att["emailAddress"]["address"],
-                    }
-                )
-
-            has_more_attendees = len(attendees_list) > 6
-            remaining_count = len(attendees_list) - 6 if has_more_attendees else 0
-
-            # Get attachments (just names)
-            attachments_list = evt.get("attachments", [])
-            attachment_names = [att.get("name", "Unnamed") for att in attachments_list]
-
-            # Convert UTC times to local timezone
-            start_utc = evt["start"]["dateTime"]
-            end_utc = evt["end"]["dateTime"]
-            start_local = convert_utc_to_local(start_utc)
-            end_local = convert_utc_to_local(end_utc)
-
-            # Get local timezone name
-            _, local_tz_name = get_local_timezone_offset()
-
-            events.append(
-                {
-                    "id": evt["id"],
-                    "subject": evt["subject"],
-                    "start": start_local,
-                    "end": end_local,
-                    "timezone": local_tz_name,
-                    "location": (evt.get("location") or {}).get("displayName", ""),
-                    "organizer": evt["organizer"]["emailAddress"]["address"] if evt.get("organizer") else "Unknown",
-                    "organizer_name": (
-                        evt["organizer"]["emailAddress"].get("name", "") if evt.get("organizer") else "Unknown"
-                    ),
-                    "is_online_meeting": evt.get("isOnlineMeeting", False),
-                    "online_meeting_url": (evt.get("onlineMeeting") or {}).get("joinUrl", ""),
-                    "attendees": attendees_display,
-                    "more_attendees": remaining_count,
-                    "my_response": my_response,
-                    "is_cancelled": is_cancelled,
-                    "has_attachments": evt.get("hasAttachments", False),
-                    "attachments": attachment_names,
-                }
-            )
+        yield format_event_summary(evt)
+        count += 1
+        if limit and count >= limit:
+            return
+
+
+def list_events(days_ahead=7, days_back=0, limit=50, include_canceled=False, filter_subject=None, local=False):
+    """
+    List calendar events
+
+    Args:
+        days_ahead: Number of days in the future to retrieve (default 7)
+        days_back: Number of days in the past to retrieve (default 0)
+        limit: Maximum number of events to return (default 50)
+        include_canceled: Include canceled/declined events (default False)
+        filter_subject: Optional regex pattern to filter events by subject (default None)
+        local: Read from the local store after an incremental sync (default False)
+    """
+    events = list(iter_events(days_ahead, days_back, limit, include_canceled, local))
 
     # Apply subject filter if provided
     if filter_subject:
@@ -750,32 +1757,44 @@ def list_events(days_ahead=7, days_back=0, limit=50, include_canceled=False, fil
     collisions = detect_meeting_collisions(events)
 
     # Add collision warnings to events
+    events_by_id = {event["id"]: event for event in events}
+    group_by_id = {}
+    overlap_minutes = {}
+    for collision in collisions:
+        for event_id in collision["event_ids"]:
+            group_by_id[event_id] = collision["event_ids"]
+        for overlap in collision["overlaps"]:
+            first_id, second_id = overlap["event_ids"]
+            overlap_minutes[(first_id, second_id)] = overlap_minutes[(second_id, first_id)] = overlap["minutes"]
+
     for event in events:
-        event["has_collision"] = False
-        event["collides_with"] = []
-
-        for collision in collisions:
-            if event["id"] in collision["event_ids"]:
-                event["has_collision"] = True
-                # Add info about other colliding events
-                for other_id in collision["event_ids"]:
-                    if other_id != event["id"]:
-                        other_event = next((e for e in events if e["id"] == other_id), None)
-                        if other_event:
-                            event["collides_with"].append(
-                                {
-                                    "subject": other_event["subject"],
-                                    "start": other_event["start"],
-                                    "end": other_event["end"],
-                                }
-                            )
+        group = group_by_id.get(event["id"], [])
+        event["has_collision"] = bool(group)
+        event["collides_with"] = [
+            {
+                "subject": events_by_id[other_id]["subject"],
+                "start": events_by_id[other_id]["start"],
+                "end": events_by_id[other_id]["end"],
+                # 0 when only linked through another meeting of the group
+                "overlap_minutes": overlap_minutes.get((event["id"], other_id), 0),
+            }
+            for other_id in group
+            if other_id != event["id"]
+        ]
 
     return events
 
 
-def get_event(event_id):
-    """Get event details"""
-    result = make_graph_request("GET", f"/me/calendar/events/{event_id}")
+def get_event(event_id, local=False):
+    """Get event details (from the local store after an incremental sync if local)"""
+    result = None
+    if local:
+        sync_calendar()
+        result = get_stored_event(event_id)
+
+    # Events outside the store window, or stored without their body, come from Graph
+    if not result or "body" not in result:
+        result = make_graph_request("GET", f"/me/calendar/events/{event_id}")
 
     return {
         "id": result["id"],
@@ -880,40 +1899,89 @@ def respond_to_event(event_id, response_type, comment=None, send_response=True):
     return True
 
 
-def download_event_attachment(event_id, attachment_id, output_dir=None):
-    """Download an attachment from a calendar event"""
-    import os
-    from pathlib import Path
-    import base64
-
-    # Get attachment details
-    result = make_graph_request("GET", f"/me/events/{event_id}/attachments/{attachment_id}")
+def download_attachment(parent, attachment_id, output_dir=None, file_name=None):
+    """
+    Download an attachment of a message or event to disk
 
-    if not result:
-        raise Exception("Failed to retrieve attachment")
+    The raw content is streamed from /$value and written in DOWNLOAD_CHUNK_SIZE
+    chunks, so memory use does not depend on the attachment size.
 
-    # Get attachment name and content
-    file_name = result.get("name", "attachment")
-    content_bytes = result.get("contentBytes")
+    Args:
+        parent: Graph path of the message or event (e.g. "/me/messages/{id}")
+        attachment_id: Attachment ID
+        output_dir: Destination directory (default ~/Downloads)
+        file_name: File name to use (default: the attachment name)
 
-    if not content_bytes:
-        raise Exception("No content found in attachment")
+    Returns:
+        Path of the downloaded file
+    """
+    if not file_name:
+        # Only the metadata, not the base64 content
+        result = make_graph_request("GET", f"{parent}/attachments/{attachment_id}", params={"$select": "name"})
+        file_name = result.get("name") or "attachment"
 
     # Determine output directory
     if not output_dir:
         output_dir = os.path.expanduser("~/Downloads")
 
-    output_path = Path(output_dir) / file_name
+    # Attachment names must not escape the output directory
+    output_path = Path(output_dir).expanduser() / os.path.basename(file_name)
+    tmp_path = output_path.with_name(output_path.name + ".part")
 
-    # Decode base64 content and write to file
-    file_content = base64.b64decode(content_bytes)
-
-    with open(output_path, "wb") as f:
-        f.write(file_content)
+    response = make_graph_request("GET", f"{parent}/attachments/{attachment_id}/$value", stream=True)
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        response.close()
 
+    os.replace(tmp_path, output_path)
     return str(output_path)
 
 
+def download_all_attachments(parent, output_dir=None):
+    """
+    Download every attachment of a message or event, in parallel
+
+    Args:
+        parent: Graph path of the message or event (e.g. "/me/events/{id}")
+        output_dir: Destination directory (default ~/Downloads)
+
+    Returns:
+        List of downloaded file paths
+    """
+    attachments = list(iter_graph_items(f"{parent}/attachments", params={"$select": "id,name"}))
+
+    # Attachments sharing a name get a numbered suffix instead of overwriting each other
+    tasks = []
+    used_names = set()
+    for att in attachments:
+        name = os.path.basename(att.get("name") or "attachment")
+        stem, ext = os.path.splitext(name)
+        counter = 1
+        while name.lower() in used_names:
+            counter += 1
+            name = f"{stem} ({counter}){ext}"
+        used_names.add(name.lower())
+        tasks.append((download_attachment, (parent, att["id"], output_dir, name)))
+
+    return run_concurrently(tasks)
+
+
+def download_event_attachment(event_id, attachment_id, output_dir=None):
+    """Download an attachment from a calendar event"""
+    return download_attachment(f"/me/events/{event_id}", attachment_id, output_dir)
+
+
+def download_email_attachment(message_id, attachment_id, output_dir=None):
+    """Download an attachment from an email"""
+    return download_attachment(f"/me/messages/{message_id}", attachment_id, output_dir)
+
+
 # ============================================================================
 # CLI INTERFACE
 # ============================================================================
@@ -924,13 +1992,37 @@ def print_json(data):
     print(json.dumps(data, indent=2, ensure_ascii=False))
 
 
+def apply_to_messages(func, message_ids, *args):
+    """
+    Apply an action to several messages concurrently
+    Returns: number of messages processed successfully (errors are printed)
+    """
+    results = run_concurrently([(func, (message_id, *args)) for message_id in message_ids], return_exceptions=True)
+
+    succeeded = 0
+    for message_id, result in zip(message_ids, results):
+        if isinstance(result, Exception):
+            print(f"Error: {message_id}: {result}", file=sys.stderr)
+        else:
+            succeeded += 1
+    return succeeded
+
+
+def print_jsonl(items):
+    """Print items as JSON lines, as soon as each one is available"""
+    for item in items:
+        print(json.dumps(item, ensure_ascii=False), flush=True)
+
+
 def main():
     """Main CLI interface"""
     if len(sys.argv) < 2:
         print("Office 365 Manager - Email and Calendar Management")
         print("\nUsage: o365_manager.py <command> [options]")
         print("\nEmail Commands:")
-        print("  list-emails [--folder inbox] [--limit 10] [--unread] [--search 'query']")
+        print(
+            "  list-emails [--folder inbox] [--limit 10] [--unread] [--search 'query'] [--format json|jsonl] [--local]"
+        )
         print("  read-email <message_id>")
         print(
             "  send-email --to addr1,addr2 --subject 'Subject' --body 'Body' [--cc addr3] [--body-type HTML|Text] [--attachments file1,file2]"
@@ -939,18 +2031,22 @@ def main():
             "  create-draft --to addr1,addr2 --subject 'Subject' --body 'Body' [--cc addr3] [--body-type HTML|Text] [--attachments file1,file2]"
         )
         print("  reply-email <message_id> --comment 'Reply text'")
-        print("  mark-read <message_id>")
-        print("  mark-unread <message_id>")
-        print("  delete-email <message_id>")
-        print("  move-email <message_id> --folder 'FolderName'")
-        print("  archive-email <message_id>")
+        print("  mark-read <message_id> [<message_id> ...]")
+        print("  mark-unread <message_id> [<message_id> ...]")
+        print("  delete-email <message_id> [<message_id> ...]")
+        print("  move-email <message_id> [<message_id> ...] --folder 'FolderName'")
+        print("  archive-email <message_id> [<message_id> ...]")
         print("  list-folders")
-        print("  search-emails --query 'search term' [--limit 20]")
+        print("  download-email-attachment <message_id> <attachment_id> [--output-dir ~/Downloads]")
+        print("  download-email-attachments <message_id> [--output-dir ~/Downloads] - Download all attachments")
+        print("  search-emails --query 'search term' [--limit 20] [--format json|jsonl] [--local]")
+        print("  sync [--folder inbox] [--reset] - Sync message metadata into the local store")
         print("\nCalendar Commands:")
         print(
-            "  list-events [--days 7] [--days-back 0] [--limit 50] [--include-canceled | --all | --full] [--filter-subject 'regex']"
+            "  list-events [--days 7] [--days-back 0] [--limit 50] [--include-canceled | --all | --full] [--filter-subject 'regex'] [--local]"
         )
-        print("  get-event <event_id>")
+        print("  get-event <event_id> [--local]")
+        print("  sync-calendar [--reset] - Sync calendar events into the local store")
         print(
             "  create-event --subject 'Meeting' --start '2025-11-12T14:00:00' --end '2025-11-12T15:00:00' [--attendees addr1,addr2] [--location 'Room'] [--body 'Description']"
         )
@@ -958,11 +2054,17 @@ def main():
         print("  delete-event <event_id>")
         print("  respond-event <event_id> --response accept|decline|tentative [--comment 'Message'] [--no-send]")
         print("  download-event-attachment <event_id> <attachment_id> [--output-dir ~/Downloads]")
+        print("  download-event-attachments <event_id> [--output-dir ~/Downloads] - Download all attachments")
         print("\nInbox Management Commands:")
-        print("  process-inbox [--limit 100] [--dry-run] - Process inbox with filtering rules and return summary")
-        print("  mark-important <message_id> - Mark email as important/VIP")
+        print(
+            "  process-inbox [--limit 100] [--since-days N] [--dry-run] [--local] - Process unread inbox with filtering rules and return summary"
+        )
+        print("  mark-important <message_id> [<message_id> ...] - Mark email as important/VIP")
         print("\nOther Commands:")
         print("  auth - Force re-authentication")
+        print("\nNotes:")
+        print("  --limit 0 fetches every page (list-emails, search-emails, list-events, process-inbox)")
+        print("  --local reads from the local store, syncing only the changes since the last run")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -995,11 +2097,23 @@ def main():
 
         elif command == "list-emails":
             folder = args.get("folder", "inbox")
-            limit = int(args.get("limit", 10))
+            limit = int(args.get("limit", 10)) or None
             unread_only = "unread" in args
             search = args.get("search")
-            emails = list_emails(folder, limit, unread_only, search)
-            print_json(emails)
+            local = "local" in args
+            if args.get("format") == "jsonl":
+                print_jsonl(iter_emails(folder, limit, unread_only, search, local))
+            else:
+                print_json(list_emails(folder, limit, unread_only, search, local))
+
+        elif command == "sync":
+            folder = args.get("folder", "inbox")
+            reset = "reset" in args
+            stats = sync_mailbox(folder, reset)
+            print(
+                f"Synced '{folder}': {stats['updated']} updated, {stats['removed']} removed, "
+                f"{stats['total']} messages stored"
+            )
 
         elif command == "read-email":
             message_id = args.get("_positional", [None])[0]
@@ -1058,68 +2172,106 @@ def main():
             print("Reply sent successfully!")
 
         elif command == "mark-read":
-            message_id = args.get("_positional", [None])[0]
-            if not message_id:
+            message_ids = args.get("_positional", [])
+            if not message_ids:
                 print("Error: message_id required")
                 sys.exit(1)
-            mark_email(message_id, True)
-            print("Email marked as read!")
+            if len(message_ids) == 1:
+                mark_email(message_ids[0], True)
+                print("Email marked as read!")
+            else:
+                succeeded = apply_to_messages(mark_email, message_ids, True)
+                print(f"{succeeded}/{len(message_ids)} emails marked as read!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "mark-unread":
-            message_id = args.get("_positional", [None])[0]
-            if not message_id:
+            message_ids = args.get("_positional", [])
+            if not message_ids:
                 print("Error: message_id required")
                 sys.exit(1)
-            mark_email(message_id, False)
-            print("Email marked as unread!")
+            if len(message_ids) == 1:
+                mark_email(message_ids[0], False)
+                print("Email marked as unread!")
+            else:
+                succeeded = apply_to_messages(mark_email, message_ids, False)
+                print(f"{succeeded}/{len(message_ids)} emails marked as unread!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "delete-email":
-            message_id = args.get("_positional", [None])[0]
-            if not message_id:
+            message_ids = args.get("_positional", [])
+            if not message_ids:
                 print("Error: message_id required")
                 sys.exit(1)
-            delete_email(message_id)
-            print("Email deleted!")
+            if len(message_ids) == 1:
+                delete_email(message_ids[0])
+                print("Email deleted!")
+            else:
+                succeeded = apply_to_messages(delete_email, message_ids)
+                print(f"{succeeded}/{len(message_ids)} emails deleted!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "move-email":
-            message_id = args.get("_positional", [None])[0]
+            message_ids = args.get("_positional", [])
             folder = args.get("folder", "")
 
-            if not message_id or not folder:
+            if not message_ids or not folder:
                 print("Error: message_id and --folder required")
                 sys.exit(1)
 
-            move_email(message_id, folder)
-            print(f"Email moved to '{folder}' folder!")
+            if len(message_ids) == 1:
+                move_email(message_ids[0], folder)
+                print(f"Email moved to '{folder}' folder!")
+            else:
+                succeeded = apply_to_messages(move_email, message_ids, folder)
+                print(f"{succeeded}/{len(message_ids)} emails moved to '{folder}' folder!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "archive-email":
-            message_id = args.get("_positional", [None])[0]
-            if not message_id:
+            message_ids = args.get("_positional", [])
+            if not message_ids:
                 print("Error: message_id required")
                 sys.exit(1)
-            archive_email(message_id)
-            print("Email archived!")
+            if len(message_ids) == 1:
+                archive_email(message_ids[0])
+                print("Email archived!")
+            else:
+                succeeded = apply_to_messages(archive_email, message_ids)
+                print(f"{succeeded}/{len(message_ids)} emails archived!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "list-folders":
-            folders = get_mail_folders()
+            folders = refresh_folder_cache()
             print("Available mail folders:")
             for folder_name in sorted(folders.keys()):
                 print(f"  - {folder_name}")
 
         elif command == "mark-important":
-            message_id = args.get("_positional", [None])[0]
-            if not message_id:
+            message_ids = args.get("_positional", [])
+            if not message_ids:
                 print("Error: message_id required")
                 sys.exit(1)
-            mark_important(message_id)
-            print("Email marked as important!")
+            if len(message_ids) == 1:
+                mark_important(message_ids[0])
+                print("Email marked as important!")
+            else:
+                succeeded = apply_to_messages(mark_important, message_ids)
+                print(f"{succeeded}/{len(message_ids)} emails marked as important!")
+                if succeeded < len(message_ids):
+                    sys.exit(1)
 
         elif command == "process-inbox":
-            limit = int(args.get("limit", 100))
+            limit = int(args.get("limit", 100)) or None
             dry_run = "dry-run" in args
+            local = "local" in args
+            since_days = int(args["since-days"]) if args.get("since-days") else None
 
             print(f"Processing inbox (limit: {limit}, dry_run: {dry_run})...")
-            results = process_inbox(limit=limit, dry_run=dry_run)
+            results = process_inbox(limit=limit, dry_run=dry_run, local=local, since_days=since_days)
 
             # Print summary
             print("\n" + "=" * 80)
@@ -1151,6 +2303,12 @@ def main():
                 if len(results["keep"]) > 10:
                     print(f"  ... and {len(results['keep']) - 10} more")
 
+            if results["failed"]:
+                print(f"\n❌ FAILED ({len(results['failed'])} emails):")
+                for email in results["failed"]:
+                    print(f"  ✗ {email['from_name']} - {email['subject']}")
+                    print(f"    Action: {email['action']} - Error: {email['error']}")
+
             # Overall summary
             total = sum(len(results[key]) for key in results)
             print(f"\n" + "=" * 80)
@@ -1159,6 +2317,8 @@ def main():
             print(f"  - Archived: {len(results['archive'])}")
             print(f"  - Flagged: {len(results['flag'])}")
             print(f"  - Kept: {len(results['keep'])}")
+            if results["failed"]:
+                print(f"  - Failed: {len(results['failed'])}")
             print("=" * 80)
 
             if dry_run:
@@ -1167,30 +2327,42 @@ def main():
 
         elif command == "search-emails":
             query = args.get("query", "")
-            limit = int(args.get("limit", 20))
+            limit = int(args.get("limit", 20)) or None
 
             if not query:
                 print("Error: --query required")
                 sys.exit(1)
 
-            emails = search_emails(query, limit)
-            print_json(emails)
+            local = "local" in args
+            if args.get("format") == "jsonl":
+                print_jsonl(iter_search_emails(query, limit, local))
+            else:
+                print_json(search_emails(query, limit, local))
 
         elif command == "list-events":
             days = int(args.get("days", 7))
             days_back = int(args.get("days-back", 0))
-            limit = int(args.get("limit", 50))
+            limit = int(args.get("limit", 50)) or None
             include_canceled = "include-canceled" in args or "all" in args or "full" in args
             filter_subject = args.get("filter-subject")
-            events = list_events(days, days_back, limit, include_canceled, filter_subject)
+            local = "local" in args
+            events = list_events(days, days_back, limit, include_canceled, filter_subject, local)
             print_json(events)
 
+        elif command == "sync-calendar":
+            stats = sync_calendar(reset="reset" in args)
+            window_start, window_end = get_calendar_sync_window()
+            print(
+                f"Synced calendar {window_start.date()} to {window_end.date()}: {stats['updated']} updated, "
+                f"{stats['removed']} removed, {stats['total']} events stored"
+            )
+
         elif command == "get-event":
             event_id = args.get("_positional", [None])[0]
             if not event_id:
                 print("Error: event_id required")
                 sys.exit(1)
-            event = get_event(event_id)
+            event = get_event(event_id, local="local" in args)
             print_json(event)
 
         elif command == "create-event":
@@ -1260,6 +2432,29 @@ def main():
             file_path = download_event_attachment(event_id, attachment_id, output_dir)
             print(f"Attachment downloaded to: {file_path}")
 
+        elif command == "download-email-attachment":
+            positional = args.get("_positional", [])
+            if len(positional) < 2:
+                print("Error: message_id and attachment_id required")
+                sys.exit(1)
+            output_dir = args.get("output-dir")
+
+            file_path = download_email_attachment(positional[0], positional[1], output_dir)
+            print(f"Attachment downloaded to: {file_path}")
+
+        elif command in ("download-email-attachments", "download-event-attachments"):
+            item_id = args.get("_positional", [None])[0]
+            if not item_id:
+                print("Error: message_id or event_id required")
+                sys.exit(1)
+            output_dir = args.get("output-dir")
+
+            parent = f"/me/messages/{item_id}" if command == "download-email-attachments" else f"/me/events/{item_id}"
+            file_paths = download_all_attachments(parent, output_dir)
+            print(f"{len(file_paths)} attachment(s) downloaded:")
+            for file_path in file_paths:
+                print(f"  - {file_path}")
+
         else:
             print(f"Unknown command: {command}")
             sys.exit(1)